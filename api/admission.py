@@ -0,0 +1,237 @@
+"""NYT Games API admission control module.
+
+Requests are admitted by route class against a shared budget of in-flight
+cost. Cache-servable puzzle reads are cheap and go first. Expensive scrapes
+and range queries wait behind them, and are shed early with 503 once the
+queue delay is over target. Per-client token buckets cap how fast any one
+client can spend the upstream quota.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+ADMISSION_CAPACITY = float(os.environ.get("ADMISSION_CAPACITY", "40"))
+ADMISSION_TARGET_DELAY = float(os.environ.get("ADMISSION_TARGET_DELAY", "1.0"))
+ADMISSION_MAX_WAIT = float(os.environ.get("ADMISSION_MAX_WAIT", "10.0"))
+ADMISSION_CLIENT_RATE = float(os.environ.get("ADMISSION_CLIENT_RATE", "5"))
+ADMISSION_CLIENT_BURST = float(os.environ.get("ADMISSION_CLIENT_BURST", "20"))
+ADMISSION_MAX_CLIENTS = int(os.environ.get("ADMISSION_MAX_CLIENTS", "10000"))
+# Proxies that append to X-Forwarded-For in front of the app. Cloud Run's
+# front end is one; entries left of those are set by the client.
+ADMISSION_TRUSTED_HOPS = int(os.environ.get("ADMISSION_TRUSTED_HOPS", "1"))
+
+
+class Shed(Exception):
+    """Raised when a request is rejected."""
+
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    """A class of routes with the same priority and cost."""
+    name: str
+    # Lower values are admitted first.
+    priority: int
+    # Share of the in-flight budget used while the request runs.
+    cost: float
+    # Tokens taken from the client's bucket.
+    tokens: float
+
+
+CACHEABLE = RouteClass("cacheable", priority=0, cost=1, tokens=0.2)
+UPSTREAM = RouteClass("upstream", priority=1, cost=4, tokens=1)
+EXPENSIVE = RouteClass("expensive", priority=2, cost=10, tokens=5)
+
+# First match wins. Paths that match nothing are not admission controlled.
+# Cached routes are reclassified by whether the puzzle is in the cache.
+ROUTE_CLASSES = [
+    (re.compile(r"^/spelling-bee/?$"), EXPENSIVE),
+    (re.compile(r"^/crosswords/puzzles/?$"), EXPENSIVE),
+    (re.compile(r"^/wordle/latest/?$"), UPSTREAM),
+    (re.compile(r"^/spelling-bee/latest/?$"), UPSTREAM),
+    (re.compile(r"^/crosswords/game/"), UPSTREAM),
+    (re.compile(r"^/(connections|strands|wordle)/[^/]+/?$"), CACHEABLE),
+    (re.compile(r"^/crosswords/(bonus|daily|mini)/[^/]+/?$"), CACHEABLE),
+]
+
+
+def classify(path: str, cached: bool | None = None) -> RouteClass | None:
+    """Return the route class for a path, or None if it is exempt.
+
+    A cached route is cacheable when its puzzle is in the cache, and costs
+    at least an upstream fetch when it is not. Without a cache lookup
+    (cached is None) the class is taken from the path alone.
+    """
+    for pattern, route_class in ROUTE_CLASSES:
+        if pattern.match(path):
+            if cached:
+                return CACHEABLE
+            if cached is False and route_class is CACHEABLE:
+                return UPSTREAM
+            return route_class
+    return None
+
+
+class TokenBuckets:
+    """Per-client token buckets, evicting the least recently seen clients."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+
+    def take(self, client: str, tokens: float) -> float:
+        """Take tokens, returning 0 or the seconds until they are available."""
+        now = time.monotonic()
+        level, updated = self.buckets.pop(client, (self.burst, now))
+        level = min(self.burst, level + (now - updated) * self.rate)
+        wait = 0.0
+        if level >= tokens:
+            level -= tokens
+        else:
+            wait = (tokens - level) / self.rate
+        self.buckets[client] = (level, now)
+        while len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionController:
+    """Admit requests by priority against a budget of in-flight cost."""
+
+    def __init__(
+        self,
+        capacity: float = ADMISSION_CAPACITY,
+        target_delay: float = ADMISSION_TARGET_DELAY,
+        max_wait: float = ADMISSION_MAX_WAIT,
+    ):
+        self.capacity = capacity
+        self.target_delay = target_delay
+        self.max_wait = max_wait
+        self.in_flight = 0.0
+        self.in_flight_by_class = {}
+        self.waiters = []
+        self.sequence = itertools.count()
+        # Exponentially weighted average of recent queue delays.
+        self.delay = 0.0
+        self.shed = 0
+        self.buckets = TokenBuckets(ADMISSION_CLIENT_RATE, ADMISSION_CLIENT_BURST, ADMISSION_MAX_CLIENTS)
+
+    def _fits(self, cost: float) -> bool:
+        """Return True if a request of the given cost can start now."""
+        # A single request larger than the budget may still run alone.
+        return self.in_flight + cost <= self.capacity or self.in_flight == 0
+
+    def _start(self, route_class: RouteClass) -> None:
+        self.in_flight += route_class.cost
+        name = route_class.name
+        self.in_flight_by_class[name] = self.in_flight_by_class.get(name, 0) + route_class.cost
+
+    def _observe(self, waited: float) -> None:
+        self.delay += 0.2 * (waited - self.delay)
+
+    def _retry_after(self) -> float:
+        return max(1.0, self.delay * 2)
+
+    def _prune(self) -> None:
+        """Drop waiters that timed out or disconnected."""
+        if any(waiter[3].done() for waiter in self.waiters):
+            self.waiters = [waiter for waiter in self.waiters if not waiter[3].done()]
+            heapq.heapify(self.waiters)
+
+    def _dispatch(self) -> None:
+        """Start waiting requests, highest priority first, while they fit."""
+        while self.waiters:
+            _, _, route_class, future, _ = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            if not self._fits(route_class.cost):
+                return
+            heapq.heappop(self.waiters)
+            self._start(route_class)
+            future.set_result(None)
+
+    async def acquire(self, route_class: RouteClass, client: str) -> None:
+        """Wait until the request may run, or raise Shed."""
+        wait = self.buckets.take(client, route_class.tokens)
+        if wait:
+            self.shed += 1
+            raise Shed(429, wait, "Too many requests from this client")
+        self._prune()
+        if not self.waiters and self._fits(route_class.cost):
+            self._start(route_class)
+            self._observe(0.0)
+            return
+        # There is a standing queue: shed all but the cheapest work early.
+        if self.delay > self.target_delay and route_class.priority > CACHEABLE.priority:
+            self.shed += 1
+            raise Shed(503, self._retry_after(), "Service overloaded, try again later")
+        future = asyncio.get_running_loop().create_future()
+        start = time.monotonic()
+        entry = (route_class.priority, next(self.sequence), route_class, future, start)
+        heapq.heappush(self.waiters, entry)
+        # Start it at once if it fits ahead of lower priority waiters.
+        self._dispatch()
+        try:
+            async with asyncio.timeout(self.max_wait):
+                await future
+        except TimeoutError:
+            # The request may have been admitted just before the timeout fired.
+            if future.done() and not future.cancelled():
+                self.release(route_class)
+            self._observe(time.monotonic() - start)
+            self.shed += 1
+            raise Shed(503, self._retry_after(), "Service overloaded, try again later") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(route_class)
+            raise
+        self._observe(time.monotonic() - start)
+
+    def release(self, route_class: RouteClass) -> None:
+        """Return the request's cost to the budget and start waiters."""
+        self.in_flight -= route_class.cost
+        self.in_flight_by_class[route_class.name] -= route_class.cost
+        self._dispatch()
+
+    def status(self) -> dict:
+        """Return the current state of the controller."""
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "in_flight_by_class": self.in_flight_by_class,
+            "waiting": sum(1 for waiter in self.waiters if not waiter[3].done()),
+            "queue_delay": round(self.delay, 3),
+            "target_delay": self.target_delay,
+            "shed": self.shed,
+        }
+
+
+def client_id(headers, client, trusted_hops: int = ADMISSION_TRUSTED_HOPS) -> str:
+    """Return the client's address as recorded by the outermost trusted proxy."""
+    forwarded = [address.strip() for address in headers.get("x-forwarded-for", "").split(",")]
+    forwarded = [address for address in forwarded if address]
+    if trusted_hops and forwarded:
+        return forwarded[-min(trusted_hops, len(forwarded))]
+    return client.host if client else "unknown"
+
+
+def retry_after_header(seconds: float) -> str:
+    """Return a Retry-After header value."""
+    return str(math.ceil(seconds))
+
+
+controller = AdmissionController()
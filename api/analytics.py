@@ -0,0 +1,222 @@
+"""NYT Games API analytics module.
+
+Aggregates are updated as each new puzzle is loaded, or rebuilt in batches
+from the archive, so the stats endpoints never scan puzzle history.
+"""
+import string
+import threading
+from collections import Counter
+from itertools import chain
+from itertools import islice
+from typing import Iterable
+
+from archive import identify
+
+from models import CrosswordPuzzle
+from models import SpellingBeeGameData
+from models import WordlePuzzle
+
+import compact
+
+# Largest ranking kept for the stats endpoints.
+TOP = 100
+
+# Puzzles counted per batch, so a rebuild never holds the whole archive.
+BATCH_SIZE = 1000
+
+
+def is_down(direction: str, start: int, end: int, width: int) -> bool:
+    """Return True if a clue's answer runs down the grid.
+
+    Clue lists are keyed "Down" or "D" (or "Across" or "A"). Failing that, a
+    clue whose first and last cells are a multiple of the width apart runs
+    down, since an across answer never spans more than a row.
+    """
+    initial = direction[:1].upper()
+    if initial in ("A", "D"):
+        return initial == "D"
+    return end > start and (end - start) % width == 0
+
+
+def crossword_words(data: dict) -> list:
+    """Return the answer words of a crossword, read from its cell answers."""
+    words = []
+    for result in compact.pack(CrosswordPuzzle, data).data["results"]:
+        puzzle_data = result["puzzle_data"]
+        answers = puzzle_data["answers"]
+        width = result["puzzle_meta"]["width"]
+        for direction, clues in puzzle_data["clues"].items():
+            for clue in clues:
+                step = width if is_down(direction, clue.clueStart, clue.clueEnd, width) else 1
+                cells = answers[clue.clueStart:clue.clueEnd + 1:step]
+                if cells and None not in cells:
+                    words.append("".join(cells))
+    return words
+
+
+def spelling_bee_days(data: dict) -> list:
+    """Return the puzzle days included in a Spelling Bee page."""
+    return [data["today"], data["yesterday"]]
+
+
+class Analytics:
+    """Materialised aggregates across all games."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear every aggregate."""
+        with self.lock:
+            self.seen = set()
+            self.wordle_puzzles = 0
+            self.wordle_positions = [Counter() for _ in range(5)]
+            self.crossword_puzzles = 0
+            self.crossword_answers = Counter()
+            self.crossword_constructors = Counter()
+            self.crossword_editors = Counter()
+            self.spelling_bee_puzzles = 0
+            self.spelling_bee_pangrams = Counter()
+            self.spelling_bee_pangram_counts = Counter()
+            self.snapshots = {}
+
+    def _new(self, keys: Iterable[tuple]) -> list:
+        """Return the indexes of keys not yet counted, marking them as seen."""
+        indexes = []
+        for index, key in enumerate(keys):
+            if key not in self.seen:
+                self.seen.add(key)
+                indexes.append(index)
+        return indexes
+
+    def record(self, model, data: dict) -> None:
+        """Update the aggregates with one newly loaded puzzle."""
+        self.backfill(model, [data])
+
+    def backfill(self, model, puzzles: Iterable[dict]) -> None:
+        """Update the aggregates with a batch of puzzles.
+
+        The puzzles are read in batches of BATCH_SIZE, and each aggregate is
+        updated with one Counter.update per batch, which counts in C rather
+        than per puzzle in Python.
+        """
+        if model is WordlePuzzle:
+            update = self._backfill_wordle
+        elif model is CrosswordPuzzle:
+            update = self._backfill_crosswords
+        elif model is SpellingBeeGameData:
+            update = self._backfill_spelling_bee
+        else:
+            return
+        puzzles = iter(puzzles)
+        while True:
+            batch = list(islice(puzzles, BATCH_SIZE))
+            if not batch:
+                return
+            update(batch)
+
+    def _backfill_wordle(self, puzzles: list) -> None:
+        with self.lock:
+            new = [puzzles[i] for i in self._new(identify(WordlePuzzle, p) for p in puzzles)]
+            solutions = [p["solution"].upper() for p in new if len(p["solution"]) == 5]
+            for position, letters in enumerate(zip(*solutions)):
+                self.wordle_positions[position].update(letters)
+            self.wordle_puzzles += len(solutions)
+            if new:
+                self.snapshots.clear()
+
+    def _backfill_crosswords(self, puzzles: list) -> None:
+        keys = [identify(CrosswordPuzzle, p) for p in puzzles]
+        # Only daily crosswords are counted, not bonus puzzles.
+        puzzles = [p for p, key in zip(puzzles, keys) if key and key[0] == "crosswords-daily"]
+        keys = [key for key in keys if key and key[0] == "crosswords-daily"]
+        with self.lock:
+            new = [puzzles[i] for i in self._new(keys)]
+        if not new:
+            return
+        # Word extraction is the expensive part and needs no lock.
+        words = [crossword_words(p) for p in new]
+        results = [result for p in new for result in p["results"]]
+        with self.lock:
+            self.crossword_answers.update(chain.from_iterable(words))
+            self.crossword_constructors.update(chain.from_iterable(r["authors"] for r in results))
+            self.crossword_editors.update(r["puzzle_meta"]["editor"] for r in results)
+            self.crossword_puzzles += len(results)
+            self.snapshots.clear()
+
+    def _backfill_spelling_bee(self, puzzles: list) -> None:
+        days = [day for p in puzzles for day in spelling_bee_days(p)]
+        with self.lock:
+            new = [days[i] for i in self._new(("spelling-bee", day["id"]) for day in days)]
+            self.spelling_bee_pangrams.update(chain.from_iterable(day["pangrams"] for day in new))
+            self.spelling_bee_pangram_counts.update(len(day["pangrams"]) for day in new)
+            self.spelling_bee_puzzles += len(new)
+            if new:
+                self.snapshots.clear()
+
+    def rebuild(self, source) -> None:
+        """Recompute every aggregate from an archive."""
+        self.reset()
+        self.backfill(WordlePuzzle, source.iter("wordle"))
+        self.backfill(CrosswordPuzzle, source.iter("crosswords-daily"))
+        self.backfill(SpellingBeeGameData, source.iter("spelling-bee"))
+
+    def _snapshot(self, name: str, build) -> dict:
+        """Return a stats document, rebuilt only after the aggregates change."""
+        with self.lock:
+            if name not in self.snapshots:
+                self.snapshots[name] = build()
+            return self.snapshots[name]
+
+    def wordle_letters(self) -> dict:
+        """Return Wordle solution letter frequencies by position."""
+        return self._snapshot("wordle_letters", lambda: {
+            "puzzles": self.wordle_puzzles,
+            "positions": [
+                {letter: counts[letter] for letter in string.ascii_uppercase}
+                for counts in self.wordle_positions
+            ],
+        })
+
+    def crossword_top_answers(self) -> dict:
+        """Return the most reused crossword answers."""
+        return self._snapshot("crossword_answers", lambda: {
+            "puzzles": self.crossword_puzzles,
+            "answers": [
+                {"name": answer, "count": count}
+                for answer, count in self.crossword_answers.most_common(TOP)
+            ],
+        })
+
+    def crossword_people(self) -> dict:
+        """Return the most frequent crossword constructors and editors."""
+        return self._snapshot("crossword_people", lambda: {
+            "puzzles": self.crossword_puzzles,
+            "constructors": [
+                {"name": name, "count": count}
+                for name, count in self.crossword_constructors.most_common(TOP)
+            ],
+            "editors": [
+                {"name": name, "count": count}
+                for name, count in self.crossword_editors.most_common(TOP)
+            ],
+        })
+
+    def spelling_bee_pangram_stats(self) -> dict:
+        """Return Spelling Bee pangram counts."""
+        return self._snapshot("spelling_bee_pangrams", lambda: {
+            "puzzles": self.spelling_bee_puzzles,
+            "pangrams": sum(self.spelling_bee_pangrams.values()),
+            "pangrams_per_puzzle": {
+                str(count): puzzles
+                for count, puzzles in sorted(self.spelling_bee_pangram_counts.items())
+            },
+            "top_pangrams": [
+                {"name": word, "count": count}
+                for word, count in self.spelling_bee_pangrams.most_common(TOP)
+            ],
+        })
+
+
+analytics = Analytics()
@@ -0,0 +1,82 @@
+"""NYT Games API puzzle archive module."""
+import json
+import os
+import tempfile
+from typing import Iterator
+
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "")
+
+
+def identify(model, data: dict) -> tuple | None:
+    """Return the archive game and key for a puzzle, or None."""
+    # pylint: disable=too-many-return-statements
+    name = model.__name__
+    if name == "ConnectionsPuzzle":
+        return "connections", data["print_date"]
+    if name == "CrosswordMini":
+        return "crosswords-mini", data["publicationDate"]
+    if name == "CrosswordPuzzle":
+        if not data["results"]:
+            return None
+        result = data["results"][0]
+        publish_type = result["puzzle_meta"]["publishType"].lower()
+        return f"crosswords-{publish_type}", f"{result['print_date']}-{result['puzzle_id']}"
+    if name == "SpellingBeeGameData":
+        return "spelling-bee", data["today"]["printDate"]
+    if name == "StrandsPuzzle":
+        return "strands", data["printDate"]
+    if name == "WordlePuzzle":
+        return "wordle", data["print_date"]
+    return None
+
+
+class Archive:
+    """Raw puzzle JSON stored as one file per game and key."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, game: str, key: str) -> str:
+        """Return the path of an archived puzzle."""
+        return os.path.join(self.root, game, f"{key}.json")
+
+    def __contains__(self, item: tuple) -> bool:
+        return os.path.exists(self.path(*item))
+
+    def store(self, game: str, key: str, data: dict) -> bool:
+        """Archive a puzzle, returning False if it was already archived."""
+        path = self.path(game, key)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=os.path.dirname(path),
+            delete=False,
+            encoding="utf-8",
+            suffix=".tmp",
+        ) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(f.name, path)
+        return True
+
+    def keys(self, game: str) -> list:
+        """Return the archived keys for a game, in order."""
+        try:
+            names = os.listdir(os.path.join(self.root, game))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+
+    def load(self, game: str, key: str) -> dict:
+        """Return an archived puzzle."""
+        with open(self.path(game, key), encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter(self, game: str) -> Iterator[dict]:
+        """Yield every archived puzzle for a game, in key order."""
+        for key in self.keys(game):
+            yield self.load(game, key)
+
+
+archive = Archive(ARCHIVE_DIR) if ARCHIVE_DIR else None
@@ -0,0 +1,310 @@
+"""NYT Games API cache module."""
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import precompile
+
+CACHE_MAXSIZE = int(os.environ.get("CACHE_MAXSIZE", "512"))
+
+# Puzzles for a specific date never change once published.
+CACHE_TTL = float(os.environ.get("CACHE_TTL", "86400"))
+
+# Endpoints such as "today" change at every release.
+CACHE_TODAY_TTL = float(os.environ.get("CACHE_TODAY_TTL", "300"))
+
+# Shared cache tier, e.g. "redis://10.0.0.3:6379/0" or "sqlite:////tmp/cache.db".
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "")
+
+# Bump to invalidate every shared entry, e.g. after changing the encoding.
+CACHE_FORMAT = b"\x03"
+
+
+def compute_schema_version(model) -> str:
+    """Return a short hash of a model's JSON schema."""
+    schema = json.dumps(model.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:12]
+
+
+@functools.cache
+def schema_version(model) -> str:
+    """Return a model's schema version, precompiled at build time if possible."""
+    precompiled = precompile.load().get("schema_versions", {})
+    return precompiled.get(model.__name__) or compute_schema_version(model)
+
+
+def cache_key(model, url: str) -> str:
+    """Return the cache key for a model fetched from a URL.
+
+    The key includes the model's schema version, so changing a model in
+    models.py never serves entries cached for the previous schema.
+    """
+    return f"{model.__name__}:{schema_version(model)}:{url}"
+
+
+def _to_json(value):
+    """Return JSON data for values, such as packed puzzles, that provide it."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Serialise a value for the shared cache tier."""
+    data = json.dumps(
+        value,
+        default=_to_json,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return CACHE_FORMAT + zlib.compress(data)
+
+
+def loads(data: bytes):
+    """Deserialise a value from the shared cache tier."""
+    if not data.startswith(CACHE_FORMAT):
+        return None
+    return json.loads(zlib.decompress(data[len(CACHE_FORMAT):]))
+
+
+class LRUCache:
+    """In-process least recently used cache with per-entry expiry."""
+
+    def __init__(self, maxsize: int = CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float = CACHE_TTL) -> None:
+        """Store a value, evicting the least recently used entries."""
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove a value."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    async def aget(self, key: str, restore=None):  # pylint: disable=unused-argument
+        """Return the cached value, or None.
+
+        Values are kept as they were stored, so restore is never needed.
+        """
+        return self.get(key)
+
+    async def aset(self, key: str, value, ttl: float = CACHE_TTL) -> None:
+        """Store a value."""
+        self.set(key, value, ttl)
+
+
+class SQLiteBackend:
+    """Shared cache tier stored in a SQLite database."""
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> tuple:
+        """Return the stored bytes and remaining lifetime, or None."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT value, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], row[1] - time.time()
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store bytes."""
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove bytes."""
+        with self.lock:
+            self.connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Take or renew a lease, returning True if the owner holds it."""
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    "SELECT value, expires FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now and row[0] != owner.encode("utf-8"):
+                    return False
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                    (key, owner.encode("utf-8"), now + ttl),
+                )
+                return True
+            finally:
+                self.connection.execute("COMMIT")
+
+
+class RedisBackend:
+    """Shared cache tier stored in Redis or a Redis-compatible server."""
+
+    # Set the key if it is free or already ours, atomically.
+    ACQUIRE = """
+    local holder = redis.call("GET", KEYS[1])
+    if holder and holder ~= ARGV[1] then
+        return 0
+    end
+    redis.call("SET", KEYS[1], ARGV[1], "PX", ARGV[2])
+    return 1
+    """
+
+    def __init__(self, url: str):
+        import redis  # pylint: disable=import-outside-toplevel
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> tuple:
+        """Return the stored bytes and remaining lifetime, or None."""
+        with self.client.pipeline() as pipe:
+            value, ttl = pipe.get(key).pttl(key).execute()
+        if value is None:
+            return None
+        return value, ttl / 1000 if ttl > 0 else CACHE_TTL
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store bytes."""
+        self.client.set(key, value, px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        """Remove bytes."""
+        self.client.delete(key)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Take or renew a lease, returning True if the owner holds it."""
+        return bool(self.client.eval(self.ACQUIRE, 1, key, owner, int(ttl * 1000)))
+
+
+class TieredCache:
+    """In-process LRU cache in front of a shared cache tier."""
+
+    def __init__(self, local: LRUCache, backend):
+        self.local = local
+        self.backend = backend
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the local tier holds the key, without reading the shared tier."""
+        return key in self.local
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def _fetch(self, key: str, restore=None):
+        """Return a value from the shared tier, storing it locally.
+
+        The shared tier holds plain JSON, so restore, if given, turns it back
+        into the form that was stored, e.g. a packed puzzle, before it is
+        kept in the local tier.
+        """
+        try:
+            entry = self.backend.get(key)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"Shared cache get of {key} failed: {error}")
+            return None
+        if entry is None:
+            return None
+        value = loads(entry[0])
+        if value is not None:
+            if restore:
+                value = restore(value)
+            self.local.set(key, value, entry[1])
+        return value
+
+    def _store(self, key: str, value, ttl: float) -> None:
+        """Store a value in the shared tier."""
+        try:
+            self.backend.set(key, dumps(value), ttl)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"Shared cache set of {key} failed: {error}")
+
+    def get(self, key: str):
+        """Return the cached value from the nearest tier that has it."""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return self._fetch(key)
+
+    def set(self, key: str, value, ttl: float = CACHE_TTL) -> None:
+        """Store a value in both tiers."""
+        self.local.set(key, value, ttl)
+        self._store(key, value, ttl)
+
+    async def aget(self, key: str, restore=None):
+        """Return the cached value, reading the shared tier in a thread."""
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self._fetch, key, restore)
+
+    async def aset(self, key: str, value, ttl: float = CACHE_TTL) -> None:
+        """Store a value in both tiers, writing the shared tier in a thread."""
+        self.local.set(key, value, ttl)
+        await asyncio.to_thread(self._store, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        """Remove a value from both tiers."""
+        self.local.delete(key)
+        try:
+            self.backend.delete(key)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"Shared cache delete of {key} failed: {error}")
+
+
+def get_backend(url: str = CACHE_BACKEND):
+    """Return the shared cache backend configured by a URL, if any."""
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend: {url}")
+
+
+backend = get_backend()
+cache = TieredCache(LRUCache(), backend) if backend else LRUCache()
@@ -0,0 +1,277 @@
+"""NYT Games API compact puzzle representation module.
+
+Crossword clues and cells and Connections cards are stored as slotted
+dataclasses, or as arrays for crossword clue lists, instead of one dict or
+Pydantic model each. Internal pipelines and the in-process cache hold packed
+puzzles, which are unpacked to plain data only at the HTTP boundary. Packed
+puzzles hold the model's JSON dump, and unpack to exactly that dump.
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Card:
+    """Connections Puzzle Card."""
+    content: str
+    position: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Card":
+        """Return a card from its JSON data."""
+        return cls(data["content"], data["position"])
+
+    def to_dict(self) -> dict:
+        """Return the JSON data for the card."""
+        return {"content": self.content, "position": self.position}
+
+
+@dataclass(frozen=True, slots=True)
+class MiniCell:
+    """Crossword Mini Cell."""
+    answer: str | None = None
+    clues: Tuple[int, ...] | None = None
+    label: int | None = None
+    type: int | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MiniCell":
+        """Return a cell from its JSON data."""
+        clues = data.get("clues")
+        return cls(
+            data.get("answer"),
+            tuple(clues) if clues is not None else None,
+            data.get("label"),
+            data.get("type"),
+        )
+
+    def to_dict(self) -> dict:
+        """Return the JSON data for the cell, as the model dumps it."""
+        return {
+            "answer": self.answer,
+            "clues": list(self.clues) if self.clues is not None else None,
+            "label": self.label,
+            "type": self.type,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class MiniClue:
+    """Crossword Mini Clue."""
+    cells: Tuple[int, ...]
+    direction: str
+    label: str
+    text: Tuple[Dict[str, str], ...]
+    list: int | None = None
+    relatives: Tuple[int, ...] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MiniClue":
+        """Return a clue from its JSON data."""
+        relatives = data.get("relatives")
+        return cls(
+            tuple(data["cells"]),
+            data["direction"],
+            data["label"],
+            tuple(data["text"]),
+            data.get("list"),
+            tuple(relatives) if relatives is not None else None,
+        )
+
+    def to_dict(self) -> dict:
+        """Return the JSON data for the clue, as the model dumps it."""
+        return {
+            "cells": list(self.cells),
+            "direction": self.direction,
+            "label": self.label,
+            "list": self.list,
+            "relatives": list(self.relatives) if self.relatives is not None else None,
+            "text": list(self.text),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Clue:
+    """Crossword Puzzle Clue."""
+    clueNum: int  # pylint: disable=invalid-name
+    clueStart: int  # pylint: disable=invalid-name
+    clueEnd: int  # pylint: disable=invalid-name
+    value: str
+    formatted: str | None = None
+
+
+class ClueList:
+    """Crossword Puzzle Clues for one direction, stored as parallel arrays."""
+
+    __slots__ = ("nums", "starts", "ends", "values", "formatted")
+
+    def __init__(self, clues: List[dict]):
+        self.nums = array("H", (clue["clueNum"] for clue in clues))
+        self.starts = array("H", (clue["clueStart"] for clue in clues))
+        self.ends = array("H", (clue["clueEnd"] for clue in clues))
+        self.values = tuple(clue["value"] for clue in clues)
+        # Most clues have no formatted text, so only the exceptions are kept.
+        self.formatted = {
+            index: clue["formatted"]
+            for index, clue in enumerate(clues)
+            if clue.get("formatted") is not None
+        } or None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> Clue:
+        return Clue(
+            self.nums[index],
+            self.starts[index],
+            self.ends[index],
+            self.values[index],
+            self.formatted.get(index) if self.formatted else None,
+        )
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def to_list(self) -> List[dict]:
+        """Return the JSON data for the clues."""
+        clues = []
+        for index, value in enumerate(self.values):
+            clues.append({
+                "clueNum": self.nums[index],
+                "clueStart": self.starts[index],
+                "clueEnd": self.ends[index],
+                "formatted": self.formatted.get(index) if self.formatted else None,
+                "value": value,
+            })
+        return clues
+
+
+def _pack_crossword(data: dict) -> dict:
+    """Replace crossword clue lists and layouts with compact forms."""
+    results = []
+    for result in data.get("results", []):
+        puzzle_data = result["puzzle_data"]
+        results.append({
+            **result,
+            "puzzle_data": {
+                **puzzle_data,
+                "answers": tuple(puzzle_data["answers"]),
+                "clues": {
+                    direction: ClueList(clues)
+                    for direction, clues in puzzle_data["clues"].items()
+                },
+                "layout": array("h", puzzle_data["layout"]),
+            },
+        })
+    return {**data, "results": results}
+
+
+def _unpack_crossword(data: dict) -> dict:
+    """Return crossword data with compact forms expanded."""
+    results = []
+    for result in data.get("results", []):
+        puzzle_data = result["puzzle_data"]
+        results.append({
+            **result,
+            "puzzle_data": {
+                **puzzle_data,
+                "answers": list(puzzle_data["answers"]),
+                "clues": {
+                    direction: clues.to_list()
+                    for direction, clues in puzzle_data["clues"].items()
+                },
+                "layout": puzzle_data["layout"].tolist(),
+            },
+        })
+    return {**data, "results": results}
+
+
+def _pack_mini(data: dict) -> dict:
+    """Replace mini cells and clues with slotted objects."""
+    return {
+        **data,
+        "body": [
+            {
+                **body,
+                "cells": tuple(MiniCell.from_dict(cell) for cell in body["cells"]),
+                "clues": tuple(MiniClue.from_dict(clue) for clue in body["clues"]),
+            }
+            for body in data.get("body", [])
+        ],
+    }
+
+
+def _unpack_mini(data: dict) -> dict:
+    """Return mini data with slotted objects expanded."""
+    return {
+        **data,
+        "body": [
+            {
+                **body,
+                "cells": [cell.to_dict() for cell in body["cells"]],
+                "clues": [clue.to_dict() for clue in body["clues"]],
+            }
+            for body in data.get("body", [])
+        ],
+    }
+
+
+def _pack_connections(data: dict) -> dict:
+    """Replace connections cards with slotted objects."""
+    return {
+        **data,
+        "categories": [
+            {**category, "cards": tuple(Card.from_dict(card) for card in category["cards"])}
+            for category in data.get("categories", [])
+        ],
+    }
+
+
+def _unpack_connections(data: dict) -> dict:
+    """Return connections data with slotted objects expanded."""
+    return {
+        **data,
+        "categories": [
+            {**category, "cards": [card.to_dict() for card in category["cards"]]}
+            for category in data.get("categories", [])
+        ],
+    }
+
+
+CODECS = {
+    "ConnectionsPuzzle": (_pack_connections, _unpack_connections),
+    "CrosswordMini": (_pack_mini, _unpack_mini),
+    "CrosswordPuzzle": (_pack_crossword, _unpack_crossword),
+}
+
+
+class Packed:
+    """A puzzle held in its compact form."""
+
+    __slots__ = ("model", "data")
+
+    def __init__(self, model: str, data: dict):
+        self.model = model
+        self.data = data
+
+    def to_dict(self) -> dict:
+        """Return the puzzle as plain JSON data."""
+        return CODECS[self.model][1](self.data)
+
+
+def pack(model, data: dict):
+    """Return the compact form of validated puzzle data, if the model has one."""
+    codec = CODECS.get(model.__name__)
+    if codec is None:
+        return data
+    return Packed(model.__name__, codec[0](data))
+
+
+def unpack(value):
+    """Return plain JSON data for a value returned by pack."""
+    if isinstance(value, Packed):
+        return value.to_dict()
+    return value
@@ -0,0 +1,122 @@
+"""NYT Games API compact representation memory benchmark.
+
+Builds a year of synthetic daily crosswords with realistic grid and clue
+counts (15x15 on weekdays, 21x21 on Sundays) and compares the memory held
+by raw JSON data, Pydantic models and packed compact puzzles:
+
+    python compact_bench.py
+"""
+import datetime
+import gc
+import json
+import random
+import string
+import time
+import tracemalloc
+
+import compact
+import parsers
+
+from models import CrosswordPuzzle
+
+WORDS = [
+    "".join(random.Random(seed).choices(string.ascii_lowercase, k=random.Random(seed).randint(3, 9)))
+    for seed in range(2000)
+]
+
+
+def crossword(day: datetime.date, rng: random.Random) -> bytes:
+    """Return the upstream JSON for a synthetic daily crossword."""
+    size = 21 if day.weekday() == 6 else 15
+    cells = size * size
+    layout = [0 if rng.random() < 0.16 else 1 for _ in range(cells)]
+    answers = [rng.choice(string.ascii_uppercase) if cell else None for cell in layout]
+    clues = {}
+    for direction in ["Across", "Down"]:
+        clues[direction] = [
+            {
+                "clueNum": number,
+                "clueStart": rng.randrange(cells),
+                "clueEnd": rng.randrange(cells),
+                "value": " ".join(rng.choices(WORDS, k=rng.randint(2, 7))).capitalize(),
+                **({"formatted": "<i>" + rng.choice(WORDS) + "</i>"} if rng.random() < 0.05 else {}),
+            }
+            for number in range(1, int(cells * 0.33) + 1)
+        ]
+    date = day.isoformat()
+    return json.dumps({
+        "entitlement": "premium",
+        "status": "OK",
+        "results": [{
+            "puzzle_id": rng.randint(10000, 30000),
+            "authors": ["A. Constructor"],
+            "enhanced_tier_date": None,
+            "print_date": date,
+            "promo_id": None,
+            "puzzle_data": {
+                "answers": answers,
+                "clues": clues,
+                "clueListOrder": ["Across", "Down"],
+                "layout": layout,
+            },
+            "puzzle_meta": {
+                "author": "A. Constructor",
+                "copyright": str(day.year),
+                "editor": "Will Shortz",
+                "formatType": "Normal",
+                "height": size,
+                "layoutExtra": [],
+                "links": [],
+                "notes": [],
+                "printDate": date,
+                "printDotw": day.isoweekday(),
+                "publishType": "Daily",
+                "title": "",
+                "width": size,
+                "relatedContent": {"text": "", "url": ""},
+            },
+            "version": 0,
+        }],
+    }).encode("utf-8")
+
+
+def measure(label: str, build, bodies: list) -> list:
+    """Print the memory retained by the objects built from the bodies."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = [build(body) for body in bodies]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<16} {retained / 2 ** 20:8.1f} MiB {elapsed:8.2f} s")
+    return objects
+
+
+def main() -> None:
+    """Run the benchmark."""
+    rng = random.Random(0)
+    start = datetime.date(2023, 1, 1)
+    bodies = [crossword(start + datetime.timedelta(days=day), rng) for day in range(365)]
+    clues = sum(
+        len(clue_list)
+        for body in bodies
+        for clue_list in json.loads(body)["results"][0]["puzzle_data"]["clues"].values()
+    )
+    print(f"{len(bodies)} crosswords, {clues} clues")
+    print(f"{'representation':<16} {'retained':>12} {'build':>10}")
+    measure("raw json", json.loads, bodies)
+    measure("pydantic", lambda body: CrosswordPuzzle(**json.loads(body)), bodies)
+    # The app packs the model's dump, as returned by the parsers.
+    dumps = [parsers.parse_puzzle(body, "CrosswordPuzzle") for body in bodies]
+    packed = measure("compact", lambda data: compact.pack(CrosswordPuzzle, data), dumps)
+
+    start_time = time.perf_counter()
+    for value, data in zip(packed, dumps):
+        assert compact.unpack(value) == data
+    print(f"unpacked and checked every puzzle in {time.perf_counter() - start_time:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""NYT Games API puzzle release events module.
+
+One poller per instance watches for new puzzles and publishes a compact
+notice to every subscriber, so clients wait on a Server-Sent Events stream
+instead of polling the puzzle endpoints themselves.
+"""
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+from collections import deque
+from typing import AsyncIterator
+from typing import Callable
+
+import compact
+import prewarm
+import upstream
+
+EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", "15"))
+EVENTS_HEARTBEAT = float(os.environ.get("EVENTS_HEARTBEAT", "15"))
+EVENTS_BUFFER = int(os.environ.get("EVENTS_BUFFER", "100"))
+
+# Return the puzzle id and print date of a puzzle, by model name.
+IDENTITIES = {
+    "ConnectionsPuzzle": lambda data: (data["id"], data["print_date"]),
+    "CrosswordMini": lambda data: (data["id"], data["publicationDate"]),
+    "CrosswordPuzzle": lambda data: (data["results"][0]["puzzle_id"], data["results"][0]["print_date"]),
+    "SpellingBeeGameData": lambda data: (data["today"]["id"], data["today"]["printDate"]),
+    "StrandsPuzzle": lambda data: (data["id"], data["printDate"]),
+    "WordlePuzzle": lambda data: (data["id"], data["print_date"]),
+}
+
+
+def etag(data: dict) -> str:
+    """Return an ETag for puzzle data."""
+    body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+
+def notice(game: str, model, entry: dict) -> dict:
+    """Return the release notice for a cached puzzle entry."""
+    value = entry["value"]
+    # Packed puzzles keep their ids and dates in plain form.
+    data = value.data if isinstance(value, compact.Packed) else value
+    puzzle_id, print_date = IDENTITIES[model.__name__](data)
+    return {"game": game, "date": print_date, "puzzle_id": puzzle_id, "etag": entry["etag"]}
+
+
+def format_event(data: dict, event_id: int | None = None) -> bytes:
+    """Return a notice formatted as a Server-Sent Event."""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += ["event: puzzle", "data: " + json.dumps(data, separators=(",", ":")), "", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+class Broker:
+    """Fan out notices to subscribers from a shared ring buffer.
+
+    Subscribers keep only the id of the last event they sent and wait on one
+    shared event, so an idle connection costs a suspended generator.
+    """
+
+    def __init__(self, size: int = EVENTS_BUFFER):
+        self.events = deque(maxlen=size)
+        self.latest = {}
+        self.last_id = 0
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+
+    def publish(self, data: dict) -> None:
+        """Publish a notice to every subscriber."""
+        self.last_id += 1
+        self.events.append((self.last_id, data))
+        self.latest[data["game"]] = data
+        # Wake everyone waiting on the current event and start a new one.
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def observe(self, data: dict) -> None:
+        """Record the current puzzle for a game without publishing it."""
+        self.latest[data["game"]] = data
+
+    async def subscribe(self, last_id: int | None = None, games: set | None = None) -> AsyncIterator[bytes]:
+        """Yield Server-Sent Events until the client disconnects."""
+        self.subscribers += 1
+        try:
+            yield f"retry: {int(EVENTS_HEARTBEAT * 1000)}\n\n".encode("utf-8")
+            oldest = self.events[0][0] if self.events else self.last_id + 1
+            if last_id is None or last_id < oldest - 1 or last_id > self.last_id:
+                # New or too far behind: start from the current puzzles.
+                last_id = self.last_id
+                for data in list(self.latest.values()):
+                    if not games or data["game"] in games:
+                        yield format_event(data)
+            while True:
+                changed = self.changed
+                for event_id, data in list(self.events):
+                    if event_id <= last_id:
+                        continue
+                    last_id = event_id
+                    if not games or data["game"] in games:
+                        yield format_event(data, event_id)
+                if last_id < self.last_id:
+                    continue
+                try:
+                    async with asyncio.timeout(EVENTS_HEARTBEAT):
+                        await changed.wait()
+                except TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            self.subscribers -= 1
+
+
+class Poller:
+    """Poll for each game's current puzzle and publish changes."""
+
+    def __init__(self, load: Callable, broker: Broker, releases: list = None):
+        # load(url, model, ttl) returns the cache entry for a puzzle, holding
+        # its value and ETag, and fetches it on a miss.
+        self.load = load
+        self.broker = broker
+        self.releases = prewarm.RELEASES if releases is None else releases
+
+    async def run(self) -> None:
+        """Poll until cancelled."""
+        while True:
+            try:
+                await self.poll()
+            except Exception as error:  # pylint: disable=broad-except
+                print(f"Events poll failed: {error}")
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+
+    async def poll(self) -> None:
+        """Check every game once."""
+        import requests  # pylint: disable=import-outside-toplevel
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for release in self.releases:
+            target = release.targets(release.current(now))[0]
+            try:
+                entry = await self.load(target.url, target.model, target.ttl)
+                current = notice(release.game, target.model, entry)
+            except (requests.RequestException, upstream.CircuitOpenError, LookupError, ValueError):
+                continue
+            previous = self.broker.latest.get(release.game)
+            if previous is None:
+                self.broker.observe(current)
+            elif previous["etag"] != current["etag"] and previous["date"] <= current["date"]:
+                self.broker.publish(current)
+
+
+broker = Broker()
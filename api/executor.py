@@ -0,0 +1,101 @@
+"""NYT Games API executor module.
+
+CPU-heavy parsing and validation of large payloads is sent to a process
+pool so it does not stall the event loop. Small payloads run inline. Work
+beyond the queue limit, and work caught by a worker crash, runs in a thread.
+"""
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
+import os
+
+EXECUTOR_WORKERS = int(os.environ.get("EXECUTOR_WORKERS", max(0, (os.cpu_count() or 1) - 1)))
+# Validation costs about 50 us per KiB, so every crossword (16 KiB daily,
+# 30 KiB and up on Sundays) goes to the pool while Wordle, Connections and
+# Strands payloads of a few KiB run inline.
+EXECUTOR_THRESHOLD = int(os.environ.get("EXECUTOR_THRESHOLD", "8192"))
+EXECUTOR_MAX_QUEUE = int(os.environ.get("EXECUTOR_MAX_QUEUE", str(EXECUTOR_WORKERS * 4)))
+
+
+def _warm() -> None:
+    """Import the parsing stack in a worker process."""
+    # pylint: disable=import-outside-toplevel,unused-import
+    import bs4  # noqa: F401
+
+    import parsers  # noqa: F401
+
+
+class Executor:
+    """Run functions of a raw body inline or in a process pool by body size."""
+
+    def __init__(
+        self,
+        workers: int = EXECUTOR_WORKERS,
+        threshold: int = EXECUTOR_THRESHOLD,
+        max_queue: int = EXECUTOR_MAX_QUEUE,
+    ):
+        self.workers = workers
+        self.threshold = threshold
+        self.max_queue = max_queue
+        self.pool = None
+        self.pending = 0
+        self.counts = {"inline": 0, "pool": 0, "overflow": 0, "restarts": 0}
+
+    def start(self) -> None:
+        """Start the worker processes, if any are configured."""
+        if self.workers and self.pool is None:
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_warm,
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def run(self, func, body: bytes, *args):
+        """Return func(body, *args), run in the pool if the body is large."""
+        if self.pool is None or len(body) < self.threshold:
+            self.counts["inline"] += 1
+            return func(body, *args)
+        if self.pending >= self.max_queue:
+            self.counts["overflow"] += 1
+            return await asyncio.to_thread(func, body, *args)
+        self.counts["pool"] += 1
+        self.pending += 1
+        pool = self.pool
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, func, body, *args)
+        except concurrent.futures.process.BrokenProcessPool:
+            self.restart(pool)
+            # This body may be what killed the worker, so it is not retried there.
+            return await asyncio.to_thread(func, body, *args)
+        finally:
+            self.pending -= 1
+
+    def restart(self, broken) -> None:
+        """Replace a pool whose worker died, unless it was already replaced."""
+        if self.pool is not broken:
+            return
+        print("Executor process pool broke, restarting it")
+        self.counts["restarts"] += 1
+        self.shutdown()
+        self.start()
+
+    def status(self) -> dict:
+        """Return the current state of the executor."""
+        return {
+            "workers": self.workers if self.pool else 0,
+            "threshold": self.threshold,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            **self.counts,
+        }
+
+
+executor = Executor()
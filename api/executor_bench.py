@@ -0,0 +1,106 @@
+"""NYT Games API executor event loop lag benchmark.
+
+Runs a mixed load of large Sunday crosswords and small Wordle puzzles
+through the parse executor, inline and with a process pool at the default
+threshold, builds each response as the app does, and reports how late a
+5 ms timer on the event loop fires while the load runs:
+
+    python executor_bench.py
+"""
+import asyncio
+import datetime
+import json
+import os
+import random
+import statistics
+import time
+
+from fastapi.responses import JSONResponse
+
+import compact
+import events
+import parsers
+from compact_bench import crossword
+from executor import EXECUTOR_THRESHOLD
+from executor import EXECUTOR_WORKERS
+from executor import Executor
+
+from models import CrosswordPuzzle
+from models import WordlePuzzle
+
+CLIENTS = int(os.environ.get("BENCH_CLIENTS", "8"))
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", "25"))
+WORKERS = int(os.environ.get("BENCH_WORKERS", str(max(1, EXECUTOR_WORKERS))))
+TICK = 0.005
+
+SUNDAY = crossword(datetime.date(2024, 1, 7), random.Random(0))
+WORDLE = json.dumps({
+    "id": 1,
+    "days_since_launch": 1,
+    "editor": "Tracy Bennett",
+    "print_date": "2024-01-07",
+    "solution": "crane",
+}).encode("utf-8")
+
+
+async def monitor(lags: list, done: asyncio.Event) -> None:
+    """Record how late each timer tick fires."""
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def request(executor: Executor, model, body: bytes) -> bytes:
+    """Parse a payload and build its response as the app does on a miss."""
+    data = await executor.run(parsers.parse_puzzle, body, model.__name__)
+    entry = {"etag": events.etag(data), "value": compact.pack(model, data)}
+    return JSONResponse(compact.unpack(entry["value"]), headers={"ETag": entry["etag"]}).body
+
+
+async def client(executor: Executor, rng: random.Random) -> None:
+    """Send a mix of large and small payloads."""
+    for _ in range(REQUESTS):
+        if rng.random() < 0.3:
+            await request(executor, CrosswordPuzzle, SUNDAY)
+        else:
+            await request(executor, WordlePuzzle, WORDLE)
+        await asyncio.sleep(rng.uniform(0, 0.01))
+
+
+async def run(label: str, executor: Executor) -> None:
+    """Run the load and print the event loop lag."""
+    executor.start()
+    # Let the workers start before measuring.
+    if executor.pool:
+        await executor.run(parsers.parse_puzzle, SUNDAY, "CrosswordPuzzle")
+    lags = []
+    done = asyncio.Event()
+    watcher = asyncio.create_task(monitor(lags, done))
+    start = time.perf_counter()
+    rng = random.Random(1)
+    await asyncio.gather(*(client(executor, random.Random(rng.random())) for _ in range(CLIENTS)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await watcher
+    executor.shutdown()
+    lags.sort()
+    print(
+        f"{label:<22} {elapsed:7.2f} s"
+        f" {statistics.median(lags) * 1000:8.1f} ms"
+        f" {lags[int(len(lags) * 0.99) - 1] * 1000:8.1f} ms"
+        f" {lags[-1] * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    print(f"Sunday crossword {len(SUNDAY) // 1024} KiB, Wordle {len(WORDLE)} bytes, threshold {EXECUTOR_THRESHOLD} bytes")
+    print(f"{CLIENTS} clients x {REQUESTS} requests, 30% Sunday crosswords")
+    print(f"{'mode':<22} {'total':>9} {'lag p50':>11} {'lag p99':>11} {'lag max':>11}")
+    asyncio.run(run("inline", Executor(workers=0)))
+    asyncio.run(run(f"process pool ({WORKERS})", Executor(workers=WORKERS, max_queue=WORKERS * 4)))
+
+
+if __name__ == "__main__":
+    main()
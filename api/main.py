@@ -1,21 +1,43 @@
 """NYT Games API."""
+import asyncio
+import contextlib
+import importlib
 import json
+import math
 import re
+from typing import Annotated
 from typing import Optional
 
-import requests
-
-from bs4 import BeautifulSoup
-
 from fastapi import FastAPI
 from fastapi import Path
 from fastapi import Query
 
 from starlette.requests import Request
+from starlette.responses import JSONResponse
 from starlette.responses import Response
 from starlette.responses import StreamingResponse
 
+from admission import Shed
+from admission import classify
+from admission import client_id
+from admission import controller
+from admission import retry_after_header
+
+from analytics import analytics
+
+from archive import archive
+from archive import identify
+
+from cache import CACHE_TODAY_TTL
+from cache import CACHE_TTL
+from cache import cache
+from cache import cache_key
+
+from executor import executor
+
 from models import ConnectionsPuzzle
+from models import ConnectionsSearchCategory
+from models import ConnectionsSearchWord
 from models import CrosswordGame
 from models import CrosswordMini
 from models import CrosswordPublishType
@@ -23,40 +45,212 @@ from models import CrosswordPuzzle
 from models import CrosswordPuzzlesList
 from models import SpellingBeeGameData
 from models import SpellingBeeLatest
+from models import StatsConnectionsRepeats
+from models import StatsCrosswordAnswers
+from models import StatsCrosswordPeople
+from models import StatsSpellingBeePangrams
+from models import StatsWordleLetters
 from models import StrandsPuzzle
 from models import WordlePuzzle
 from models import WordlePuzzlesList
 
-
-def get_game_data(body: bytes) -> dict | None:
-    """Get Game Data from Spelling Bee Page."""
-    soup = BeautifulSoup(body, 'html.parser')
-    script_tag = soup.find('script', text=re.compile(r'window\.gameData\s*='))
-    if script_tag:
-        script_content = script_tag.string
-        if script_content.startswith("window.gameData = {"):
-            return json.loads(script_content[len("window.gameData = "):])
-    return None
-
-
-def get(url, request: Request, params=None) -> dict:
+import compact
+import events
+import parsers
+import precompile
+import prewarm
+import upstream
+
+from projection import parse_fields
+from projection import project
+
+from search import connections_index
+
+# Modules that are only needed to talk to the upstream, imported after startup.
+DEFERRED_IMPORTS = ["requests", "bs4"]
+
+JSON_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+}
+
+# The model and upstream URL of each cached route, so admission control can
+# tell whether a request will be served from the cache. First match wins.
+CACHED_ROUTES = [
+    (re.compile(r"^/connections/(?P<date>[^/]+)/?$"), ConnectionsPuzzle,
+     "https://www.nytimes.com/svc/connections/v2/{date}.json"),
+    (re.compile(r"^/crosswords/bonus/(?P<date>[^/]+)/?$"), CrosswordPuzzle,
+     "https://www.nytimes.com/svc/crosswords/v6/puzzle/bonus/{date}.json"),
+    (re.compile(r"^/crosswords/daily/today/?$"), CrosswordPuzzle,
+     "https://www.nytimes.com/svc/crosswords/v2/puzzle/daily.json"),
+    (re.compile(r"^/crosswords/daily/(?P<date>[^/]+)/?$"), CrosswordPuzzle,
+     "https://www.nytimes.com/svc/crosswords/v2/puzzle/daily-{date}.json"),
+    (re.compile(r"^/crosswords/mini/today/?$"), CrosswordMini,
+     "https://www.nytimes.com/svc/crosswords/v6/puzzle/mini.json"),
+    (re.compile(r"^/crosswords/mini/(?P<date>[^/]+)/?$"), CrosswordMini,
+     "https://www.nytimes.com/svc/crosswords/v6/puzzle/mini/{date}.json"),
+    (re.compile(r"^/spelling-bee/?$"), SpellingBeeGameData,
+     "https://www.nytimes.com/puzzles/spelling-bee"),
+    (re.compile(r"^/strands/(?P<date>[^/]+)/?$"), StrandsPuzzle,
+     "https://www.nytimes.com/games-assets/strands/{date}.json"),
+    (re.compile(r"^/wordle/(?P<date>(?!latest/?$)[^/]+)/?$"), WordlePuzzle,
+     "https://www.nytimes.com/svc/wordle/v2/{date}.json"),
+]
+
+Fields = Annotated[
+    Optional[str],
+    Query(
+        description="Comma separated dotted paths of the fields to return.",
+        example="results.print_date,results.puzzle_meta.title",
+    ),
+]
+
+
+async def get(url, request: Request | None = None, params=None) -> dict:
     """Return the response from a GET request."""
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-    }
-    response = requests.get(
+    response = await upstream.fetch(
         url,
-        cookies=request.cookies,
-        headers=headers,
+        cookies=request.cookies if request else None,
+        headers=JSON_HEADERS,
         params=params,
-        timeout=30,
     )
-    print(response.request.url)
-    response.raise_for_status()
     return response.json()
 
 
+async def download(url, model, cookies: dict | None = None) -> dict:
+    """Fetch a puzzle and return its validated data."""
+    if model is SpellingBeeGameData:
+        response = await upstream.fetch(url, cookies=cookies)
+        return await executor.run(parsers.parse_game_data, response.content)
+    response = await upstream.fetch(url, cookies=cookies, headers=JSON_HEADERS)
+    return await executor.run(parsers.parse_puzzle, response.content, model.__name__)
+
+
+async def fetch_puzzle(url, model, ttl=CACHE_TTL) -> tuple:
+    """Fetch a puzzle, validate it and store it in the cache.
+
+    Returns the puzzle data and its cache entry, which holds the packed
+    puzzle and an ETag computed once here rather than on every request.
+    The entry is served to every caller, so no cookies are forwarded.
+    """
+    data = await download(url, model)
+    entry = {"etag": events.etag(data), "value": compact.pack(model, data)}
+    await cache.aset(cache_key(model, url), entry, ttl)
+    item = identify(model, data)
+    if archive and item:
+        await asyncio.to_thread(archive.store, *item, data)
+    analytics.record(model, data)
+    connections_index.record(model, data)
+    return data, entry
+
+
+async def load_puzzle(url, model, ttl=CACHE_TTL) -> dict:
+    """Fetch a puzzle, store it in the cache and return its data."""
+    data, _ = await fetch_puzzle(url, model, ttl=ttl)
+    return data
+
+
+async def get_cached(url, model, request: Request | None = None, ttl=CACHE_TTL) -> dict:
+    """Return a puzzle's cache entry, fetching it on a miss.
+
+    Cookies may entitle a caller to content that others are not, so a
+    request with cookies is fetched with them and kept out of the cache.
+    """
+    if request and request.cookies:
+        data = await download(url, model, cookies=request.cookies)
+        return {"etag": events.etag(data), "value": data}
+    entry = await cache.aget(
+        cache_key(model, url),
+        restore=lambda entry: {**entry, "value": compact.pack(model, entry["value"])},
+    )
+    if entry is None:
+        _, entry = await fetch_puzzle(url, model, ttl=ttl)
+    return entry
+
+
+def is_cached(request: Request) -> bool | None:
+    """Return whether a request for a cached route is in the local cache.
+
+    Returns None for routes that are not cached. Requests with cookies
+    bypass the cache, so they are never served from it.
+    """
+    path = request.url.path
+    for pattern, model, url in CACHED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            if request.cookies:
+                return False
+            return cache_key(model, url.format(**match.groupdict())) in cache
+    return None
+
+
+def respond(value, model, fields: Optional[str] = None):
+    """Return the response model, or only the requested fields of it.
+
+    The value is validated either way, so a projection never returns data
+    the full response would have rejected.
+    """
+    response = model(**compact.unpack(value))
+    if fields:
+        return JSONResponse(project(response.model_dump(mode="json", by_alias=True), parse_fields(fields)))
+    return response
+
+
+def not_modified(request: Request, tag: str) -> bool:
+    """Return True if the request's If-None-Match header matches an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in tags or tag in tags
+
+
+def respond_cached(entry: dict, request: Request, fields: Optional[str] = None) -> Response:
+    """Return a cached puzzle with its ETag, or 304 if the client has it.
+
+    The ETag is the one sent in /events notices, so a client can tell from a
+    notice whether its copy of a puzzle is current.
+    """
+    headers = {"ETag": entry["etag"]}
+    if not_modified(request, entry["etag"]):
+        return Response(status_code=304, headers=headers)
+    value = entry["value"]
+    if fields:
+        content = project(value, parse_fields(fields))
+    else:
+        # The cache holds the model's dump, validated when it was fetched.
+        content = compact.unpack(value)
+    return JSONResponse(content, headers=headers)
+
+
+def preload() -> None:
+    """Import deferred modules once the app is accepting requests."""
+    for name in DEFERRED_IMPORTS:
+        importlib.import_module(name)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Run background tasks for the lifetime of the app."""
+    executor.start()
+    tasks = [asyncio.create_task(asyncio.to_thread(preload))]
+    if archive:
+        tasks.append(asyncio.create_task(asyncio.to_thread(analytics.rebuild, archive)))
+    tasks.append(asyncio.create_task(asyncio.to_thread(connections_index.open, archive)))
+    poller = events.Poller(
+        load=lambda url, model, ttl: get_cached(url, model, ttl=ttl),
+        broker=events.broker,
+    )
+    tasks.append(asyncio.create_task(poller.run()))
+    if prewarm.enabled():
+        prewarmer = prewarm.Prewarmer(load=lambda url, model, ttl: load_puzzle(url, model, ttl=ttl))
+        tasks.append(asyncio.create_task(prewarmer.run()))
+    yield
+    for task in tasks:
+        task.cancel()
+    executor.shutdown()
+
+
 app = FastAPI(
     contact={
         "name": "Lukas Karlsson",
@@ -64,13 +258,17 @@ app = FastAPI(
         "url": "https://github.com/lukwam",
     },
     description="NYT Games API built with FastAPI",
+    lifespan=lifespan,
     openapi_tags=[
         {"name": "Connections", "description": "Connections Puzzles operations"},
         {"name": "Crosswords", "description": "Crossword Puzzles operations"},
         {"name": "Crosswords - Bonus", "description": "Crossword Bonus Puzzles operations"},
         {"name": "Crosswords - Daily", "description": "Crossword Daily Puzzles operations"},
         {"name": "Crosswords - Mini", "description": "Crossword Mini Puzzles operations"},
+        {"name": "Events", "description": "Puzzle release events operations"},
         {"name": "Spelling Bee", "description": "Spelling Bee Puzzles operations"},
+        {"name": "Stats", "description": "Puzzle statistics operations"},
+        {"name": "Status", "description": "Service status operations"},
         {"name": "Strands", "description": "Strands Puzzles operations"},
         {"name": "Wordle", "description": "Wordle Puzzles operations"},
     ],
@@ -79,6 +277,19 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(upstream.CircuitOpenError)
+async def circuit_open_handler(
+    _request: Request,
+    exc: upstream.CircuitOpenError,
+) -> JSONResponse:
+    """Fail fast while an upstream circuit breaker is open."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
 @app.middleware("http")
 async def pretty_print_json_response(
     request: Request,
@@ -94,6 +305,10 @@ async def pretty_print_json_response(
     if request.url.path in excluded_paths or not isinstance(response, StreamingResponse):
         return response
 
+    # Only modify applicaton/json responses, leaving event streams untouched
+    if response.headers.get('content-type') != 'application/json':
+        return response
+
     # Collect the stream into a single bytes object
     body = b""
     async for chunk in response.body_iterator:
@@ -101,30 +316,87 @@ async def pretty_print_json_response(
             chunk = chunk.encode()  # Ensure chunk is bytes
         body += chunk
 
-    # Only modify applicaton/json responses
-    if response.headers.get('content-type') == 'application/json':
-        data = json.loads(body.decode())
-        pretty_json = json.dumps(
-            data,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=4,
-            separators=(", ", ": "),
-        ).encode("utf-8")
-
-        # Create a new response with the pretty JSON and original status code
-        response.headers["Content-Length"] = str(len(pretty_json))
-        return Response(
-            content=pretty_json,
-            status_code=response.status_code,
-            media_type="application/json",
-            headers=dict(response.headers),
-        )
+    data = json.loads(body.decode())
+    pretty_json = json.dumps(
+        data,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=4,
+        separators=(", ", ": "),
+    ).encode("utf-8")
+
+    # Create a new response with the pretty JSON and original status code
+    response.headers["Content-Length"] = str(len(pretty_json))
+    return Response(
+        content=pretty_json,
+        status_code=response.status_code,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
 
-    return response
+
+@app.middleware("http")
+async def admission_control(
+    request: Request,
+    call_next
+) -> Response:
+    """Admit requests by priority, shedding load early when overloaded."""
+    route_class = classify(request.url.path, cached=is_cached(request))
+    if route_class is None:
+        return await call_next(request)
+    try:
+        await controller.acquire(route_class, client_id(request.headers, request.client))
+    except Shed as exc:
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail},
+            headers={"Retry-After": retry_after_header(exc.retry_after)},
+        )
+    try:
+        return await call_next(request)
+    finally:
+        controller.release(route_class)
 
 
 # Connections
+@app.get(
+    "/connections/search/categories/{title}",
+    response_model=ConnectionsSearchCategory,
+    summary="Search Connections puzzles by category title",
+    tags=["Connections"],
+)
+async def search_connections_categories(
+    title: str = Path(..., example="Fish"),
+    fields: Fields = None,
+) -> ConnectionsSearchCategory:
+    """
+    **Search Connections puzzles by category title**
+
+    Returns every Connections category whose title matches the path parameter,
+    ignoring case and punctuation, across all indexed puzzles.
+    """
+    return respond(connections_index.search_title(title), ConnectionsSearchCategory, fields)
+
+
+@app.get(
+    "/connections/search/words/{word}",
+    response_model=ConnectionsSearchWord,
+    summary="Search Connections puzzles by word",
+    tags=["Connections"],
+)
+async def search_connections_words(
+    word: str = Path(..., example="BASS"),
+    fields: Fields = None,
+) -> ConnectionsSearchWord:
+    """
+    **Search Connections puzzles by word**
+
+    Returns every Connections puzzle containing the word in the path parameter,
+    with the category and board position of the card.
+    """
+    return respond(connections_index.search_word(word), ConnectionsSearchWord, fields)
+
+
 @app.get(
     "/connections/{date}",
     response_model=ConnectionsPuzzle,
@@ -134,6 +406,7 @@ async def pretty_print_json_response(
 async def get_connections_puzzle(
     request: Request,
     date: str = Path(..., example="2023-06-12"),
+    fields: Fields = None,
 ) -> ConnectionsPuzzle:
     """
     **Get a Connections puzzle**
@@ -145,11 +418,12 @@ async def get_connections_puzzle(
     GET https://www.nytimes.com/svc/connections/v2/{date}.json
     ```
     """
-    response = get(
+    response = await get_cached(
         f"https://www.nytimes.com/svc/connections/v2/{date}.json",
-        request=request
+        ConnectionsPuzzle,
+        request=request,
     )
-    return ConnectionsPuzzle(**response)
+    return respond_cached(response, request, fields)
 
 
 # Crosswords
@@ -162,6 +436,7 @@ async def get_connections_puzzle(
 async def get_crossword_game(
     request: Request,
     game_id: str = Path(..., example="1234"),
+    fields: Fields = None,
 ) -> CrosswordGame:
     """
     **Get a Crossword Game**
@@ -173,11 +448,11 @@ async def get_crossword_game(
     GET https://www.nytimes.com/svc/crosswords/v2/game/{game_id}.json
     ```
     """
-    response = get(
+    response = await get(
         f"https://www.nytimes.com/svc/crosswords/v2/game/{game_id}.json",
         request=request,
     )
-    return CrosswordGame(**response)
+    return respond(response, CrosswordGame, fields)
 
 
 # Crossword - Bonus
@@ -190,6 +465,7 @@ async def get_crossword_game(
 async def get_crossword_bonus(
     request: Request,
     date: str = Path(..., example="1997-02-01"),
+    fields: Fields = None,
 ):
     """
     **Get a Crossword Bonus puzzle**
@@ -201,11 +477,12 @@ async def get_crossword_bonus(
     GET https://www.nytimes.com/svc/crosswords/v6/puzzle/bonus/{date}.json
     ```
     """
-    response = get(
+    response = await get_cached(
         f"https://www.nytimes.com/svc/crosswords/v6/puzzle/bonus/{date}.json",
+        CrosswordPuzzle,
         request=request,
     )
-    return CrosswordPuzzle(**response)
+    return respond_cached(response, request, fields)
 
 
 # Crossword - Daily
@@ -215,7 +492,10 @@ async def get_crossword_bonus(
     summary="Get the Crossword Daily puzzle for today",
     tags=["Crosswords - Daily"],
 )
-async def get_crossword_puzzle_daily(request: Request):
+async def get_crossword_puzzle_daily(
+    request: Request,
+    fields: Fields = None,
+):
     """
     **Get the Crossword Daily puzzle for today**
 
@@ -226,7 +506,13 @@ async def get_crossword_puzzle_daily(request: Request):
     GET https://www.nytimes.com/svc/crosswords/v2/puzzle/daily.json
     ```
     """
-    return get("https://www.nytimes.com/svc/crosswords/v2/puzzle/daily.json", request=request)
+    response = await get_cached(
+        "https://www.nytimes.com/svc/crosswords/v2/puzzle/daily.json",
+        CrosswordPuzzle,
+        request=request,
+        ttl=CACHE_TODAY_TTL,
+    )
+    return respond_cached(response, request, fields)
 
 
 @app.get(
@@ -237,6 +523,7 @@ async def get_crossword_puzzle_daily(request: Request):
 async def get_crossword_puzzle(
     request: Request,
     date: str = Path(..., example="1993-11-21"),
+    fields: Fields = None,
 ) -> CrosswordPuzzle:
     """
     **Get a Crossword Daily puzzle**
@@ -248,11 +535,12 @@ async def get_crossword_puzzle(
     GET https://www.nytimes.com/svc/crosswords/v2/puzzle/daily-{date}.json
     ```
     """
-    response = get(
+    response = await get_cached(
         f"https://www.nytimes.com/svc/crosswords/v2/puzzle/daily-{date}.json",
-        request=request
+        CrosswordPuzzle,
+        request=request,
     )
-    return CrosswordPuzzle(**response)
+    return respond_cached(response, request, fields)
 
 
 # Crossword - Mini
@@ -264,6 +552,7 @@ async def get_crossword_puzzle(
 )
 async def get_crossword_mini_daily(
     request: Request,
+    fields: Fields = None,
 ) -> CrosswordMini:
     """
     **Get a Crossword Mini puzzle**
@@ -275,11 +564,13 @@ async def get_crossword_mini_daily(
     GET https://www.nytimes.com/svc/crosswords/v6/puzzle/mini.json
     ```
     """
-    response = get(
+    response = await get_cached(
         "https://www.nytimes.com/svc/crosswords/v6/puzzle/mini.json",
-        request=request
+        CrosswordMini,
+        request=request,
+        ttl=CACHE_TODAY_TTL,
     )
-    return CrosswordMini(**response)
+    return respond_cached(response, request, fields)
 
 
 @app.get(
@@ -290,6 +581,7 @@ async def get_crossword_mini_daily(
 async def get_crossword_mini(
     request: Request,
     date: str = Path(..., example="2014-08-14"),
+    fields: Fields = None,
 ):
     """
     **Get a Crossword Mini puzzle**
@@ -301,11 +593,12 @@ async def get_crossword_mini(
     GET https://www.nytimes.com/svc/crosswords/v6/puzzle/mini/{date}.json
     ```
     """
-    response = get(
+    response = await get_cached(
         f"https://www.nytimes.com/svc/crosswords/v6/puzzle/mini/{date}.json",
-        request=request
+        CrosswordMini,
+        request=request,
     )
-    return CrosswordMini(**response)
+    return respond_cached(response, request, fields)
 
 
 @app.get(
@@ -320,7 +613,8 @@ async def list_crossword_puzzles(
     sort_order: Optional[str] = Query(None, example="asc"),
     sort_by: Optional[str] = Query(None, example="print_date"),
     date_start: Optional[str] = Query(None, example="2024-07-01"),
-    date_end: Optional[str] = Query(None, example="2024-07-31")
+    date_end: Optional[str] = Query(None, example="2024-07-31"),
+    fields: Fields = None,
 ):
     """
     **List Crossword Puzzles**
@@ -339,12 +633,12 @@ async def list_crossword_puzzles(
         "date_start": date_start,
         "date_end": date_end,
     }
-    response = get(
+    response = await get(
         "https://www.nytimes.com/svc/crosswords/v3/puzzles.json",
         params=params,
         request=request
     )
-    return CrosswordPuzzlesList(**response)
+    return respond(response, CrosswordPuzzlesList, fields)
 
 
 # pylint: disable=line-too-long,too-many-arguments
@@ -371,6 +665,38 @@ async def list_crossword_puzzles(
 #     return response.json()
 
 
+# Events
+@app.get(
+    "/events",
+    summary="Stream new puzzle release notices",
+    tags=["Events"])
+async def get_events(
+    request: Request,
+    games: Optional[str] = Query(None, example="wordle,connections"),
+) -> StreamingResponse:
+    """
+    **Stream new puzzle release notices**
+
+    Returns a Server-Sent Events stream. Each event carries the game, print
+    date, puzzle id and ETag of a newly released puzzle. The ETag matches the
+    one sent by the puzzle routes, which answer `If-None-Match` with 304. The
+    current puzzle for each game is sent on connect, and a client reconnecting
+    with a `Last-Event-ID` header receives the events it missed.
+
+    Games: `connections`, `crosswords-daily`, `crosswords-mini`,
+    `spelling-bee`, `strands`, `wordle`.
+    """
+    try:
+        last_id = int(request.headers["last-event-id"])
+    except (KeyError, ValueError):
+        last_id = None
+    return StreamingResponse(
+        events.broker.subscribe(last_id, set(games.split(",")) if games else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # Spelling Bee
 @app.get(
     "/spelling-bee",
@@ -379,6 +705,7 @@ async def list_crossword_puzzles(
     tags=["Spelling Bee"])
 async def get_spelling_bee(
     request: Request,
+    fields: Fields = None,
 ) -> SpellingBeeGameData:
     """
     **Get Current Spelling Bee Data**
@@ -390,15 +717,13 @@ async def get_spelling_bee(
     GET https://www.nytimes.com/puzzles/spelling-bee
     ```
     """
-    url = "https://www.nytimes.com/puzzles/spelling-bee"
-    response = requests.get(
-        url,
-        cookies=request.cookies,
-        timeout=30,
+    response = await get_cached(
+        "https://www.nytimes.com/puzzles/spelling-bee",
+        SpellingBeeGameData,
+        request=request,
+        ttl=CACHE_TODAY_TTL,
     )
-    response.raise_for_status()
-    game_data = get_game_data(response.content) or {}
-    return SpellingBeeGameData(**game_data)
+    return respond_cached(response, request, fields)
 
 
 @app.get(
@@ -409,6 +734,7 @@ async def get_spelling_bee(
 async def get_spelling_bee_latest(
     request: Request,
     puzzle_ids: str = Query(None, example="1,2,3,4,5,6,7"),
+    fields: Fields = None,
 ) -> WordlePuzzlesList:
     """
     **List latest Spelling Bee puzzles**
@@ -423,8 +749,155 @@ async def get_spelling_bee_latest(
     url = "https://www.nytimes.com/svc/games/state/spelling_bee/latests"
     if puzzle_ids:
         url = f"{url}?puzzle_ids={puzzle_ids}"
-    response = get(url, request=request)
-    return WordlePuzzlesList(**response)
+    response = await get(url, request=request)
+    return respond(response, WordlePuzzlesList, fields)
+
+
+# Stats
+@app.get(
+    "/stats/connections/repeats",
+    response_model=StatsConnectionsRepeats,
+    summary="Get the most repeated Connections words and categories",
+    tags=["Stats"])
+async def get_connections_repeat_stats(
+    limit: int = Query(20, ge=1, le=100),
+    fields: Fields = None,
+) -> StatsConnectionsRepeats:
+    """
+    **Get the most repeated Connections words and categories**
+
+    Returns the words and category titles that appear in more than one
+    Connections puzzle, with the number of puzzles each appears in.
+    """
+    stats = connections_index.repeats()
+    stats = {**stats, "words": stats["words"][:limit], "categories": stats["categories"][:limit]}
+    return respond(stats, StatsConnectionsRepeats, fields)
+
+
+@app.get(
+    "/stats/crosswords/answers",
+    response_model=StatsCrosswordAnswers,
+    summary="Get the most reused Crossword answers",
+    tags=["Stats"])
+async def get_crossword_answer_stats(
+    limit: int = Query(20, ge=1, le=100),
+    fields: Fields = None,
+) -> StatsCrosswordAnswers:
+    """
+    **Get the most reused Crossword answers**
+
+    Returns the answers that appear most often across all Crossword Daily
+    puzzles loaded so far.
+    """
+    stats = analytics.crossword_top_answers()
+    return respond({**stats, "answers": stats["answers"][:limit]}, StatsCrosswordAnswers, fields)
+
+
+@app.get(
+    "/stats/crosswords/people",
+    response_model=StatsCrosswordPeople,
+    summary="Get Crossword constructor and editor counts",
+    tags=["Stats"])
+async def get_crossword_people_stats(
+    limit: int = Query(20, ge=1, le=100),
+    fields: Fields = None,
+) -> StatsCrosswordPeople:
+    """
+    **Get Crossword constructor and editor counts**
+
+    Returns the number of Crossword Daily puzzles by each constructor and
+    editor.
+    """
+    stats = analytics.crossword_people()
+    return respond(
+        {
+            **stats,
+            "constructors": stats["constructors"][:limit],
+            "editors": stats["editors"][:limit],
+        },
+        StatsCrosswordPeople,
+        fields,
+    )
+
+
+@app.get(
+    "/stats/spelling-bee/pangrams",
+    response_model=StatsSpellingBeePangrams,
+    summary="Get Spelling Bee pangram counts",
+    tags=["Stats"])
+async def get_spelling_bee_pangram_stats(
+    limit: int = Query(20, ge=1, le=100),
+    fields: Fields = None,
+) -> StatsSpellingBeePangrams:
+    """
+    **Get Spelling Bee pangram counts**
+
+    Returns the total number of pangrams, the number of puzzles by pangram
+    count and the most frequent pangrams.
+    """
+    stats = analytics.spelling_bee_pangram_stats()
+    return respond({**stats, "top_pangrams": stats["top_pangrams"][:limit]}, StatsSpellingBeePangrams, fields)
+
+
+@app.get(
+    "/stats/wordle/letters",
+    response_model=StatsWordleLetters,
+    summary="Get Wordle solution letter frequencies",
+    tags=["Stats"])
+async def get_wordle_letter_stats(
+    fields: Fields = None,
+) -> StatsWordleLetters:
+    """
+    **Get Wordle solution letter frequencies**
+
+    Returns how often each letter appears in each position of the Wordle
+    solutions loaded so far.
+    """
+    return respond(analytics.wordle_letters(), StatsWordleLetters, fields)
+
+
+# Status
+@app.get(
+    "/status/admission",
+    summary="Get admission control status",
+    tags=["Status"])
+async def get_admission_status() -> dict:
+    """
+    **Get admission status**
+
+    Returns the in-flight cost by route class, the number of waiting requests,
+    the recent queue delay and how many requests were shed.
+    """
+    return {"admission": controller.status()}
+
+
+@app.get(
+    "/status/upstream",
+    summary="Get upstream circuit breaker status",
+    tags=["Status"])
+async def get_upstream_status() -> dict:
+    """
+    **Get upstream status**
+
+    Returns the circuit breaker state, adaptive timeouts and observed latency
+    for each upstream path family.
+    """
+    return {"upstreams": upstream.status()}
+
+
+@app.get(
+    "/status/executor",
+    summary="Get parse executor status",
+    tags=["Status"])
+async def get_executor_status() -> dict:
+    """
+    **Get executor status**
+
+    Returns the process pool size, size threshold, queue depth, how many
+    payloads were parsed inline, in the pool or in a thread after the queue
+    was full, and how many times the pool was restarted.
+    """
+    return {"executor": executor.status()}
 
 
 # Strands
@@ -436,6 +909,7 @@ async def get_spelling_bee_latest(
 async def get_strands_puzzle(
     request: Request,
     date: str = Path(..., example="2024-03-04"),
+    fields: Fields = None,
 ):
     """
     **Get a Strands puzzle**
@@ -447,7 +921,12 @@ async def get_strands_puzzle(
     GET https://www.nytimes.com/games-assets/strands/{date}.json
     ```
     """
-    return get(f"https://www.nytimes.com/games-assets/strands/{date}.json", request=request)
+    response = await get_cached(
+        f"https://www.nytimes.com/games-assets/strands/{date}.json",
+        StrandsPuzzle,
+        request=request,
+    )
+    return respond_cached(response, request, fields)
 
 
 # Wordle
@@ -459,6 +938,7 @@ async def get_strands_puzzle(
 async def list_latest_wordle_puzzles(
     request: Request,
     puzzle_ids: str = Query(None, example="1,2,3,4,5,6,7"),
+    fields: Fields = None,
 ) -> WordlePuzzlesList:
     """
     **List latest Wordle puzzles**
@@ -473,8 +953,8 @@ async def list_latest_wordle_puzzles(
     url = "https://www.nytimes.com/svc/games/state/wordleV2/latests"
     if puzzle_ids:
         url = f"{url}?puzzle_ids={puzzle_ids}"
-    response = get(url, request=request)
-    return WordlePuzzlesList(**response)
+    response = await get(url, request=request)
+    return respond(response, WordlePuzzlesList, fields)
 
 
 @app.get(
@@ -485,6 +965,7 @@ async def list_latest_wordle_puzzles(
 async def get_wordle_puzzle(
     request: Request,
     date: str = Path(..., example="2021-06-19"),
+    fields: Fields = None,
 ):
     """
     **Get a Wordle puzzle**
@@ -496,4 +977,13 @@ async def get_wordle_puzzle(
     GET https://www.nytimes.com/svc/wordle/v2/{date}.json
     ```
     """
-    return get(f"https://www.nytimes.com/svc/wordle/v2/{date}.json", request=request)
+    response = await get_cached(
+        f"https://www.nytimes.com/svc/wordle/v2/{date}.json",
+        WordlePuzzle,
+        request=request,
+    )
+    return respond_cached(response, request, fields)
+
+
+# Use the OpenAPI document generated when the image was built, if current.
+app.openapi_schema = precompile.load().get("openapi")
@@ -0,0 +1,148 @@
+"""NYT Games API tests."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import admission
+import analytics
+import main
+from cache import LRUCache
+from cache import cache_key
+
+from models import WordlePuzzle
+
+WORDLE_URL = "https://www.nytimes.com/svc/wordle/v2/2024-01-07.json"
+WORDLE = {
+    "id": 1,
+    "days_since_launch": 932,
+    "editor": "Tracy Bennett",
+    "print_date": "2024-01-07",
+    "solution": "crane",
+}
+
+
+def test_admission_admits_higher_priority_request_that_fits():
+    """A cacheable request that fits is not queued behind an upstream waiter."""
+    async def run():
+        controller = admission.AdmissionController(capacity=10, max_wait=0.1)
+        for _ in range(9):
+            await controller.acquire(admission.CACHEABLE, "a")
+        waiter = asyncio.create_task(controller.acquire(admission.UPSTREAM, "b"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(controller.acquire(admission.CACHEABLE, "c"), 0.05)
+        assert controller.in_flight == 10
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+    asyncio.run(run())
+
+
+def test_admission_ignores_abandoned_waiters():
+    """Waiters that timed out do not force later requests onto the queue."""
+    async def run():
+        controller = admission.AdmissionController(capacity=5, max_wait=0.01)
+        await controller.acquire(admission.UPSTREAM, "a")
+        try:
+            await controller.acquire(admission.UPSTREAM, "b")
+        except admission.Shed as exc:
+            assert exc.status_code == 503
+        await asyncio.wait_for(controller.acquire(admission.CACHEABLE, "c"), 0.05)
+        assert controller.waiters == []
+        assert controller.in_flight == 5
+    asyncio.run(run())
+
+
+def test_admission_classifies_cached_routes_by_cache_contents(monkeypatch):
+    """Cached puzzles are cheap, and uncached ones cost an upstream fetch."""
+    monkeypatch.setattr(main, "cache", LRUCache())
+    main.cache.set(cache_key(WordlePuzzle, WORDLE_URL), {"etag": '"1"', "value": WORDLE})
+
+    def classify(path, cookies=None):
+        request = SimpleNamespace(url=SimpleNamespace(path=path), cookies=cookies or {})
+        return admission.classify(path, cached=main.is_cached(request))
+
+    assert classify("/wordle/2024-01-07") is admission.CACHEABLE
+    assert classify("/wordle/2024-01-07", cookies={"NYT-S": "secret"}) is admission.UPSTREAM
+    assert classify("/wordle/2024-01-08") is admission.UPSTREAM
+    assert classify("/wordle/latest") is admission.UPSTREAM
+    assert classify("/spelling-bee") is admission.EXPENSIVE
+    main.cache.set(cache_key(main.SpellingBeeGameData, "https://www.nytimes.com/puzzles/spelling-bee"), {})
+    assert classify("/spelling-bee") is admission.CACHEABLE
+    assert classify("/crosswords/puzzles") is admission.EXPENSIVE
+
+
+def test_get_cached_keeps_requests_with_cookies_out_of_the_cache(monkeypatch):
+    """A puzzle fetched with a caller's cookies is not served to others."""
+    sent = []
+
+    async def fetch(url, cookies=None, headers=None):
+        sent.append(cookies)
+        return SimpleNamespace(content=json.dumps(WORDLE).encode())
+
+    monkeypatch.setattr(main.upstream, "fetch", fetch)
+    monkeypatch.setattr(main, "cache", LRUCache())
+
+    async def run():
+        subscriber = SimpleNamespace(cookies={"NYT-S": "secret"})
+        anonymous = SimpleNamespace(cookies={})
+        await main.get_cached(WORDLE_URL, WordlePuzzle, request=subscriber)
+        assert len(main.cache) == 0
+        await main.get_cached(WORDLE_URL, WordlePuzzle, request=anonymous)
+        await main.get_cached(WORDLE_URL, WordlePuzzle, request=anonymous)
+        assert sent == [{"NYT-S": "secret"}, None]
+    asyncio.run(run())
+
+
+def test_backfill_reads_puzzles_in_batches(monkeypatch):
+    """A rebuild counts the archive a batch at a time."""
+    monkeypatch.setattr(analytics, "BATCH_SIZE", 2)
+    aggregates = analytics.Analytics()
+    counted = []
+
+    def puzzles():
+        for day in range(1, 6):
+            counted.append(aggregates.wordle_puzzles)
+            yield {**WORDLE, "print_date": f"2024-01-0{day}"}
+
+    aggregates.backfill(WordlePuzzle, puzzles())
+    assert counted == [0, 0, 2, 2, 4]
+    assert aggregates.wordle_puzzles == 5
+
+
+def test_crossword_words_finds_down_clues_by_key_or_stride():
+    """Down answers are read down the grid whatever the clue lists are called."""
+    def clue(number, start, end):
+        return {"clueNum": number, "clueStart": start, "clueEnd": end, "value": "Clue"}
+
+    for across, down in [("Across", "Down"), ("A", "D"), ("1", "2")]:
+        data = {
+            "status": "OK",
+            "results": [{
+                "puzzle_id": 1,
+                "authors": ["A. Constructor"],
+                "print_date": "2024-01-01",
+                "puzzle_data": {
+                    "answers": list("CATAREBED"),
+                    "clues": {across: [clue(1, 0, 2), clue(4, 3, 5)], down: [clue(1, 0, 6), clue(2, 1, 7)]},
+                    "clueListOrder": [across, down],
+                    "layout": [1] * 9,
+                },
+                "puzzle_meta": {
+                    "author": "A. Constructor",
+                    "copyright": "2024",
+                    "editor": "Will Shortz",
+                    "formatType": "Normal",
+                    "height": 3,
+                    "layoutExtra": [],
+                    "links": [],
+                    "notes": [],
+                    "printDate": "2024-01-01",
+                    "printDotw": 1,
+                    "publishType": "Daily",
+                    "title": "",
+                    "width": 3,
+                    "relatedContent": {"text": "", "url": ""},
+                },
+                "version": 0,
+            }],
+        }
+        assert analytics.crossword_words(data) == ["CAT", "ARE", "CAB", "ARE"]
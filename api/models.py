@@ -34,6 +34,43 @@ class ConnectionsPuzzle(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class ConnectionsSearchCategoryHit(BaseModel):
+    """Connections Search Category Hit."""
+    print_date: str
+    category: int
+    title: str
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ConnectionsSearchCategory(BaseModel):
+    """Connections Search Category."""
+    title: str
+    puzzles: int
+    hits: List[ConnectionsSearchCategoryHit]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ConnectionsSearchWordHit(BaseModel):
+    """Connections Search Word Hit."""
+    print_date: str
+    category: int
+    title: str
+    position: int
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ConnectionsSearchWord(BaseModel):
+    """Connections Search Word."""
+    word: str
+    puzzles: int
+    hits: List[ConnectionsSearchWordHit]
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class CrosswordGameResult(BaseModel):
     """Crossword Game."""
     id: str
@@ -379,6 +416,58 @@ class SpellingBeeLatest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class StatsCount(BaseModel):
+    """Stats Count."""
+    name: str
+    count: int
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatsConnectionsRepeats(BaseModel):
+    """Stats - Connections Repeated Words and Categories."""
+    puzzles: int
+    words: List[StatsCount]
+    categories: List[StatsCount]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatsCrosswordAnswers(BaseModel):
+    """Stats - Crossword Answers."""
+    puzzles: int
+    answers: List[StatsCount]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatsCrosswordPeople(BaseModel):
+    """Stats - Crossword Constructors and Editors."""
+    puzzles: int
+    constructors: List[StatsCount]
+    editors: List[StatsCount]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatsSpellingBeePangrams(BaseModel):
+    """Stats - Spelling Bee Pangrams."""
+    puzzles: int
+    pangrams: int
+    pangrams_per_puzzle: Dict[str, int]
+    top_pangrams: List[StatsCount]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class StatsWordleLetters(BaseModel):
+    """Stats - Wordle Solution Letters by Position."""
+    puzzles: int
+    positions: List[Dict[str, int]]
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class StrandsPuzzle(BaseModel):
     """Strands Puzzle."""
     id: int
@@ -0,0 +1,35 @@
+"""NYT Games API parsers module.
+
+These functions run either inline or in an executor worker process, so they
+take raw bytes and return the model's JSON dump of the validated data. That
+is the exact response body, so cached puzzles are served without building the
+model again.
+"""
+import json
+import re
+
+import models
+
+
+def get_game_data(body: bytes) -> dict | None:
+    """Get Game Data from Spelling Bee Page."""
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+    soup = BeautifulSoup(body, 'html.parser')
+    script_tag = soup.find('script', text=re.compile(r'window\.gameData\s*='))
+    if script_tag:
+        script_content = script_tag.string
+        if script_content.startswith("window.gameData = {"):
+            return json.loads(script_content[len("window.gameData = "):])
+    return None
+
+
+def parse_game_data(body: bytes) -> dict:
+    """Return validated Spelling Bee game data from the page HTML."""
+    data = get_game_data(body) or {}
+    return models.SpellingBeeGameData(**data).model_dump(mode="json", by_alias=True)
+
+
+def parse_puzzle(body: bytes, model_name: str) -> dict:
+    """Return puzzle data from a JSON body, validated against a model."""
+    data = json.loads(body)
+    return getattr(models, model_name)(**data).model_dump(mode="json", by_alias=True)
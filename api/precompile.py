@@ -0,0 +1,71 @@
+"""NYT Games API build-time precompilation module.
+
+Run while building the image to write the OpenAPI document and model schema
+versions, so they are not generated on the first request after a cold start:
+
+    python precompile.py
+"""
+import functools
+import hashlib
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PRECOMPILED_PATH = os.environ.get("PRECOMPILED_PATH", os.path.join(HERE, "precompiled.json"))
+
+# Sources the precompiled output is derived from.
+SOURCES = ["main.py", "models.py"]
+
+
+def fingerprint() -> str:
+    """Return a hash of the sources the precompiled output depends on."""
+    digest = hashlib.sha256()
+    for name in SOURCES:
+        with open(os.path.join(HERE, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+@functools.cache
+def load() -> dict:
+    """Return the precompiled output, or an empty dict if missing or stale."""
+    try:
+        with open(PRECOMPILED_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get("fingerprint") != fingerprint():
+        print(f"Ignoring stale {PRECOMPILED_PATH}")
+        return {}
+    return data
+
+
+def build(path: str = PRECOMPILED_PATH) -> None:
+    """Write the precompiled output."""
+    # pylint: disable=import-outside-toplevel
+    from pydantic import BaseModel
+
+    import cache
+    import main
+    import models
+
+    schema_versions = {
+        name: cache.compute_schema_version(value)
+        for name, value in vars(models).items()
+        if isinstance(value, type) and issubclass(value, BaseModel) and value is not BaseModel
+    }
+    main.app.openapi_schema = None
+    data = {
+        "fingerprint": fingerprint(),
+        "openapi": main.app.openapi(),
+        "schema_versions": schema_versions,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    build(*sys.argv[1:])
@@ -0,0 +1,321 @@
+"""NYT Games API cache prewarming module."""
+import asyncio
+import datetime
+import fcntl
+import json
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+from typing import List
+from zoneinfo import ZoneInfo
+
+from cache import CACHE_TODAY_TTL
+from cache import CACHE_TTL
+from cache import backend
+
+from models import ConnectionsPuzzle
+from models import CrosswordMini
+from models import CrosswordPuzzle
+from models import SpellingBeeGameData
+from models import StrandsPuzzle
+from models import WordlePuzzle
+
+import upstream
+
+PREWARM_ENABLED = os.environ.get("PREWARM_ENABLED", "1") == "1"
+PREWARM_LEAD = float(os.environ.get("PREWARM_LEAD", "60"))
+PREWARM_LAG = float(os.environ.get("PREWARM_LAG", "600"))
+PREWARM_INTERVAL = float(os.environ.get("PREWARM_INTERVAL", "15"))
+PREWARM_LOCK_PATH = os.environ.get(
+    "PREWARM_LOCK_PATH",
+    os.path.join(tempfile.gettempdir(), "nytgames-prewarm.lock"),
+)
+
+# A pass renews the lease before each load, so it must outlive the slowest
+# single load, including its upstream retries.
+PREWARM_LEASE_TTL = upstream.DEADLINE + PREWARM_INTERVAL
+
+# The default lock file is local to one instance, so it does not stop other
+# Cloud Run instances from prewarming at the same time.
+PREWARM_SHARED_LEASE = backend is not None or "PREWARM_LOCK_PATH" in os.environ
+
+EASTERN = ZoneInfo("America/New_York")
+
+# Date-addressed games go live at midnight in the earliest time zone, so the
+# upstream serves a date well before it is "today" in the United States.
+EARLIEST = ZoneInfo("Pacific/Kiritimati")
+
+INSTANCE_ID = os.environ.get("K_REVISION", "local") + "-" + uuid.uuid4().hex[:8]
+
+
+@dataclass
+class Target:
+    """A URL to load into the cache at release time."""
+    url: str
+    model: type
+    ttl: float
+    # "Today" URLs serve the previous puzzle until the release flips, so they
+    # are polled until the print date they return is the new puzzle's date.
+    print_date: Callable[[dict], str] | None = None
+    # Optional targets, such as tomorrow's puzzle, are only tried once.
+    optional: bool = False
+
+
+@dataclass
+class Release:
+    """A daily puzzle release."""
+    game: str
+    tz: ZoneInfo
+    # Return the local release time for the puzzle of a given date.
+    at: Callable[[datetime.date], datetime.time]
+    # Days between the release and the puzzle's print date.
+    offset: int
+    targets: Callable[[datetime.date], List[Target]]
+
+    def release_time(self, puzzle_date: datetime.date) -> datetime.datetime:
+        """Return the release time of the puzzle for a date."""
+        day = puzzle_date - datetime.timedelta(days=self.offset)
+        return datetime.datetime.combine(day, self.at(puzzle_date), tzinfo=self.tz)
+
+    def next_release(self, now: datetime.datetime) -> tuple:
+        """Return the next puzzle date and release time whose window has not closed."""
+        puzzle_date = now.astimezone(self.tz).date() - datetime.timedelta(days=1)
+        while True:
+            when = self.release_time(puzzle_date)
+            if when + datetime.timedelta(seconds=PREWARM_LAG) > now:
+                return puzzle_date, when
+            puzzle_date += datetime.timedelta(days=1)
+
+    def current(self, now: datetime.datetime) -> datetime.date:
+        """Return the date of the most recently released puzzle."""
+        puzzle_date = now.astimezone(self.tz).date() + datetime.timedelta(days=self.offset + 1)
+        while self.release_time(puzzle_date) > now:
+            puzzle_date -= datetime.timedelta(days=1)
+        return puzzle_date
+
+
+def crossword_release_time(puzzle_date: datetime.date) -> datetime.time:
+    """Return the release time for a crossword.
+
+    Puzzles come out the evening before their date: at 6pm on Saturdays and
+    Sundays (the Sunday and Monday puzzles), else at 10pm.
+    """
+    release_day = puzzle_date - datetime.timedelta(days=1)
+    if release_day.weekday() >= 5:
+        return datetime.time(18, 0)
+    return datetime.time(22, 0)
+
+
+def dated(url: str, model: type) -> Callable[[datetime.date], List[Target]]:
+    """Return targets for a date-addressed puzzle and the day after it."""
+    def targets(puzzle_date: datetime.date) -> List[Target]:
+        tomorrow = puzzle_date + datetime.timedelta(days=1)
+        return [
+            Target(url.format(date=puzzle_date.isoformat()), model, CACHE_TTL),
+            Target(url.format(date=tomorrow.isoformat()), model, CACHE_TTL, optional=True),
+        ]
+    return targets
+
+
+RELEASES = [
+    Release(
+        game="connections",
+        tz=EARLIEST,
+        at=lambda _: datetime.time(0, 0),
+        offset=0,
+        targets=dated("https://www.nytimes.com/svc/connections/v2/{date}.json", ConnectionsPuzzle),
+    ),
+    Release(
+        game="crosswords-daily",
+        tz=EASTERN,
+        at=crossword_release_time,
+        offset=1,
+        targets=lambda puzzle_date: [
+            Target(
+                "https://www.nytimes.com/svc/crosswords/v2/puzzle/daily.json",
+                CrosswordPuzzle,
+                CACHE_TODAY_TTL,
+                print_date=lambda data: data["results"][0]["print_date"],
+            ),
+            Target(
+                f"https://www.nytimes.com/svc/crosswords/v2/puzzle/daily-{puzzle_date.isoformat()}.json",
+                CrosswordPuzzle,
+                CACHE_TTL,
+            ),
+        ],
+    ),
+    Release(
+        game="crosswords-mini",
+        tz=EASTERN,
+        at=crossword_release_time,
+        offset=1,
+        targets=lambda puzzle_date: [
+            Target(
+                "https://www.nytimes.com/svc/crosswords/v6/puzzle/mini.json",
+                CrosswordMini,
+                CACHE_TODAY_TTL,
+                print_date=lambda data: data["publicationDate"],
+            ),
+            Target(
+                f"https://www.nytimes.com/svc/crosswords/v6/puzzle/mini/{puzzle_date.isoformat()}.json",
+                CrosswordMini,
+                CACHE_TTL,
+            ),
+        ],
+    ),
+    Release(
+        game="spelling-bee",
+        tz=EASTERN,
+        at=lambda _: datetime.time(3, 0),
+        offset=0,
+        targets=lambda _: [
+            Target(
+                "https://www.nytimes.com/puzzles/spelling-bee",
+                SpellingBeeGameData,
+                CACHE_TODAY_TTL,
+                print_date=lambda data: data["today"]["printDate"],
+            ),
+        ],
+    ),
+    Release(
+        game="strands",
+        tz=EARLIEST,
+        at=lambda _: datetime.time(0, 0),
+        offset=0,
+        targets=dated("https://www.nytimes.com/games-assets/strands/{date}.json", StrandsPuzzle),
+    ),
+    Release(
+        game="wordle",
+        tz=EARLIEST,
+        at=lambda _: datetime.time(0, 0),
+        offset=0,
+        targets=dated("https://www.nytimes.com/svc/wordle/v2/{date}.json", WordlePuzzle),
+    ),
+]
+
+
+def enabled() -> bool:
+    """Return True if prewarming is enabled and its lease is shared."""
+    if PREWARM_ENABLED and not PREWARM_SHARED_LEASE:
+        print("Prewarm disabled: set CACHE_BACKEND or a shared PREWARM_LOCK_PATH")
+        return False
+    return PREWARM_ENABLED
+
+
+class FileLease:
+    """A lease held by one instance at a time, stored in a shared file."""
+
+    def __init__(self, path: str = PREWARM_LOCK_PATH):
+        self.path = path
+
+    def acquire(self, owner: str, ttl: float) -> bool:
+        """Take or renew the lease, returning True if the owner holds it."""
+        with open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                holder = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                holder = {}
+            now = time.time()
+            if holder.get("owner") not in (None, owner) and holder.get("expires", 0) > now:
+                return False
+            f.seek(0)
+            f.truncate()
+            json.dump({"owner": owner, "expires": now + ttl}, f)
+            return True
+
+    def release(self, owner: str) -> None:
+        """Give up the lease if the owner holds it."""
+        with open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                holder = json.loads(f.read() or "{}")
+            except json.JSONDecodeError:
+                holder = {}
+            if holder.get("owner") == owner:
+                f.seek(0)
+                f.truncate()
+
+
+class BackendLease:
+    """A lease held by one instance at a time, stored in the shared cache tier."""
+
+    def __init__(self, shared, key: str = "lease:prewarm"):
+        self.shared = shared
+        self.key = key
+
+    def acquire(self, owner: str, ttl: float) -> bool:
+        """Take or renew the lease, returning True if the owner holds it."""
+        try:
+            return self.shared.acquire(self.key, owner, ttl)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"Prewarm lease failed: {error}")
+            return False
+
+
+class Prewarmer:
+    """Load each game's new puzzle into the cache around its release time."""
+
+    def __init__(self, load: Callable, releases: List[Release] = None, lease=None):
+        # load(url, model, ttl) fetches a URL, stores it in the cache and
+        # returns the fetched data.
+        self.load = load
+        self.releases = RELEASES if releases is None else releases
+        self.lease = lease or (BackendLease(backend) if backend else FileLease())
+
+    async def run(self) -> None:
+        """Run the scheduler for all releases until cancelled."""
+        await asyncio.gather(*(self.run_release(release) for release in self.releases))
+
+    async def run_release(self, release: Release) -> None:
+        """Prewarm every release of one game."""
+        while True:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            puzzle_date, when = release.next_release(now)
+            start = when - datetime.timedelta(seconds=PREWARM_LEAD)
+            if start > now:
+                await asyncio.sleep((start - now).total_seconds())
+            await self.prewarm(release, puzzle_date, when)
+
+    async def prewarm(
+        self,
+        release: Release,
+        puzzle_date: datetime.date,
+        when: datetime.datetime,
+    ) -> None:
+        """Poll the upstream until every target is loaded or the window closes."""
+        end = when + datetime.timedelta(seconds=PREWARM_LAG)
+        pending = release.targets(puzzle_date)
+        while pending and datetime.datetime.now(datetime.timezone.utc) < end:
+            remaining = []
+            for index, target in enumerate(pending):
+                if not await asyncio.to_thread(self.lease.acquire, INSTANCE_ID, PREWARM_LEASE_TTL):
+                    remaining += pending[index:]
+                    break
+                if not await self.warm(target, puzzle_date) and not target.optional:
+                    remaining.append(target)
+            pending = remaining
+            if pending:
+                await asyncio.sleep(PREWARM_INTERVAL)
+        # Anything left over is fetched on demand by the first caller.
+        await asyncio.sleep(max(0.0, (end - datetime.datetime.now(datetime.timezone.utc)).total_seconds()))
+
+    async def warm(self, target: Target, puzzle_date: datetime.date) -> bool:
+        """Load one target, returning True once it holds the new puzzle."""
+        import requests  # pylint: disable=import-outside-toplevel
+        try:
+            data = await self.load(target.url, target.model, target.ttl)
+        except (requests.RequestException, upstream.CircuitOpenError, ValueError) as error:
+            print(f"Prewarm of {target.url} failed: {error}")
+            return False
+        if target.print_date:
+            try:
+                return target.print_date(data) == puzzle_date.isoformat()
+            except (KeyError, IndexError, TypeError):
+                return False
+        return True
@@ -0,0 +1,62 @@
+"""NYT Games API sparse fieldset projection module.
+
+A fieldset is a comma separated list of dotted paths, such as
+`results.print_date,results.puzzle_meta.title`. Lists are traversed
+transparently, so a path applies to every item of a list it passes through.
+"""
+from array import array
+
+from compact import Packed
+
+
+def parse_fields(fields: str) -> dict:
+    """Return a tree of the requested paths."""
+    tree = {}
+    paths = [[name for name in path.strip().split(".") if name] for path in fields.split(",")]
+    # Deeper paths first, so a shorter path to the same node selects all of it.
+    for path in sorted(filter(None, paths), key=len, reverse=True):
+        node = tree
+        for name in path:
+            node = node.setdefault(name, {})
+        node.clear()
+    return tree
+
+
+def expand(value):
+    """Return compact puzzle values as plain JSON data, at any depth."""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, Packed):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {name: expand(item) for name, item in value.items()}
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "to_list"):
+        return value.to_list()
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [expand(item) for item in value]
+    return value
+
+
+def project(value, tree: dict):
+    """Return only the requested paths of a value.
+
+    Packed puzzles are projected before they are unpacked, so clue lists and
+    cells that were not requested are never expanded.
+    """
+    if not tree:
+        return expand(value)
+    if isinstance(value, Packed):
+        value = value.data
+    elif hasattr(value, "to_dict"):
+        value = value.to_dict()
+    elif hasattr(value, "to_list"):
+        value = value.to_list()
+    if isinstance(value, (list, tuple)):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {name: project(item, tree[name]) for name, item in value.items() if name in tree}
+    return expand(value)
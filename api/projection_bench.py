@@ -0,0 +1,171 @@
+"""NYT Games API sparse fieldset benchmark.
+
+Checks that every field path of each packed model projects to the same JSON
+as the unpacked puzzle, then serves cached puzzles through the app, with and
+without `?fields=`, and reports the response size and median latency of
+typical projections:
+
+    python projection_bench.py
+"""
+import asyncio
+import datetime
+import json
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("PREWARM_ENABLED", "0")
+# Every request comes from one client, so lift its rate limit for the runs.
+os.environ.setdefault("ADMISSION_CLIENT_RATE", "1e9")
+
+# pylint: disable=wrong-import-position
+import compact
+import events
+import main
+import parsers
+from cache import cache
+from cache import cache_key
+from compact_bench import crossword
+
+from models import ConnectionsPuzzle
+from models import CrosswordMini
+from models import CrosswordPuzzle
+from models import WordlePuzzle
+
+from projection import parse_fields
+from projection import project
+
+RUNS = int(os.environ.get("BENCH_RUNS", "200"))
+
+CROSSWORD_URL = "https://www.nytimes.com/svc/crosswords/v2/puzzle/daily-2024-01-07.json"
+WORDLE_URL = "https://www.nytimes.com/svc/wordle/v2/2024-01-07.json"
+
+CASES = [
+    ("crossword, full", "/crosswords/daily/2024-01-07", ""),
+    ("crossword, title and date", "/crosswords/daily/2024-01-07", "results.print_date,results.puzzle_meta.title"),
+    ("crossword, meta", "/crosswords/daily/2024-01-07", "results.puzzle_meta"),
+    ("crossword, across clues", "/crosswords/daily/2024-01-07", "results.puzzle_data.clues.Across.value"),
+    ("wordle, full", "/wordle/2024-01-07", ""),
+    ("wordle, solution", "/wordle/2024-01-07", "solution"),
+]
+
+
+CONNECTIONS = {
+    "id": 1,
+    "status": "OK",
+    "print_date": "2024-01-07",
+    "editor": "Wyna Liu",
+    "categories": [
+        {"title": "FISH", "cards": [{"content": "BASS", "position": 0}, {"content": "PIKE", "position": 5}]},
+    ],
+}
+
+MINI = {
+    "id": 1,
+    "body": [{
+        "board": "<svg></svg>",
+        "cells": [{"answer": "A", "clues": [0, 1], "label": 1, "type": 1}, {}],
+        "clues": [{"cells": [0], "direction": "Across", "label": "1", "text": [{"plain": "First letter"}]}],
+        "clueLists": [{"clues": [0], "name": "Across"}],
+        "dimensions": {"height": 1, "width": 2},
+        "SVG": {},
+    }],
+    "constructors": ["Joel Fagliano"],
+    "copyright": "2024",
+    "editor": "Joel Fagliano",
+    "lastUpdated": "2024-01-07",
+    "publicationDate": "2024-01-07",
+    "subcategory": 0,
+}
+
+
+def paths(value, prefix: str = "") -> list:
+    """Return the dotted path of every dict key in plain JSON data."""
+    found = []
+    items = value if isinstance(value, list) else [value]
+    for item in items:
+        if isinstance(item, dict):
+            for name, child in item.items():
+                path = f"{prefix}{name}"
+                found += [path, *paths(child, f"{path}.")]
+        elif isinstance(item, list):
+            found += paths(item, prefix)
+    return sorted(set(found))
+
+
+def check() -> None:
+    """Check that every path of every packed model projects to plain JSON."""
+    for model, body in [
+        (ConnectionsPuzzle, json.dumps(CONNECTIONS)),
+        (CrosswordMini, json.dumps(MINI)),
+        (CrosswordPuzzle, crossword(datetime.date(2024, 1, 7), random.Random(0))),
+    ]:
+        data = parsers.parse_puzzle(body, model.__name__)
+        packed = compact.pack(model, data)
+        assert compact.unpack(packed) == data, model.__name__
+        for path in paths(data):
+            tree = parse_fields(path)
+            projected = project(packed, tree)
+            assert json.loads(json.dumps(projected)) == project(data, tree), (model.__name__, path)
+    print("checked projections of every field path")
+
+
+async def call(path: str, query: str) -> bytes:
+    """Return the response body for a successful GET request to the app."""
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+    body = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query.encode(), "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8080),
+    }
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await main.app(scope, receive, send)
+    assert status == [200], (path, status, b"".join(body))
+    return b"".join(body)
+
+
+async def run() -> None:
+    """Run every case and print the results."""
+    check()
+    data = parsers.parse_puzzle(crossword(datetime.date(2024, 1, 7), random.Random(0)), "CrosswordPuzzle")
+    wordle = {
+        "id": 1,
+        "days_since_launch": 932,
+        "editor": "Tracy Bennett",
+        "print_date": "2024-01-07",
+        "solution": "crane",
+    }
+    cache.set(cache_key(CrosswordPuzzle, CROSSWORD_URL), {
+        "etag": events.etag(data),
+        "value": compact.pack(CrosswordPuzzle, data),
+    })
+    cache.set(cache_key(WordlePuzzle, WORDLE_URL), {"etag": events.etag(wordle), "value": wordle})
+    print(f"{'case':<28} {'bytes':>9} {'latency':>11}")
+    for label, path, fields in CASES:
+        query = f"fields={fields}" if fields else ""
+        size = len(await call(path, query))
+        timings = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            await call(path, query)
+            timings.append(time.perf_counter() - start)
+        print(f"{label:<28} {size:>9} {statistics.median(timings) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
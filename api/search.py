@@ -0,0 +1,330 @@
+"""NYT Games API Connections search index module.
+
+The index maps each card word to the puzzles, categories and board positions
+it appeared in, and each normalised category title to the categories that
+used it. It is built from the archive into one file of sorted string tables
+and uint32 postings, which is memory-mapped so a lookup is a binary search
+over the file. Puzzles fetched after the file was built are kept in a small
+in-memory delta until the next rebuild.
+"""
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from collections import defaultdict
+from typing import Iterable
+
+from archive import ARCHIVE_DIR
+
+from models import ConnectionsPuzzle
+
+CONNECTIONS_INDEX_PATH = os.environ.get(
+    "CONNECTIONS_INDEX_PATH",
+    os.path.join(ARCHIVE_DIR, "connections.index") if ARCHIVE_DIR else "",
+)
+
+# The last byte records the byte order, so a file written on another
+# platform is rebuilt rather than misread.
+MAGIC = b"NYTCIX" + b"1" + sys.byteorder[0].encode()
+
+# Largest ranking kept for the repeats stats.
+TOP = 100
+
+
+def normalise_word(content: str) -> str:
+    """Return a card word in its indexed form."""
+    return " ".join(unicodedata.normalize("NFKC", content).upper().split())
+
+
+def normalise_title(title: str) -> str:
+    """Return a category title in its indexed form, without punctuation."""
+    title = unicodedata.normalize("NFKC", title).upper()
+    return " ".join(re.sub(r"[^\w]+", " ", title).split())
+
+
+def string_table(strings: list) -> tuple:
+    """Return the offsets and UTF-8 blob of a list of strings."""
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in strings:
+        blob += value.encode()
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def posting_table(postings: dict) -> tuple:
+    """Return the sorted keys, posting offsets and postings of a mapping."""
+    keys = sorted(postings, key=str.encode)
+    offsets = array("I", [0])
+    values = array("I")
+    for key in keys:
+        values.extend(postings[key])
+        offsets.append(len(values))
+    return *string_table(keys), offsets, values
+
+
+def build(puzzles: Iterable[dict]) -> bytes:
+    """Return the index file contents for a set of Connections puzzles."""
+    dates = []
+    titles = {}
+    # Three uint32 per category: date index, category number and title index.
+    categories = array("I")
+    words = defaultdict(lambda: array("I"))
+    terms = defaultdict(lambda: array("I"))
+    for data in sorted(puzzles, key=lambda p: p["print_date"]):
+        date_index = len(dates)
+        dates.append(data["print_date"])
+        for number, category in enumerate(data["categories"]):
+            category_id = len(categories) // 3
+            title_index = titles.setdefault(category["title"], len(titles))
+            categories.extend((date_index, number, title_index))
+            terms[normalise_title(category["title"])].append(category_id)
+            for card in category["cards"]:
+                words[normalise_word(card["content"])].append(category_id << 8 | card["position"])
+    sections = [
+        *string_table(dates),
+        *string_table(list(titles)),
+        categories,
+        *posting_table(words),
+        *posting_table(terms),
+    ]
+    out = bytearray(MAGIC)
+    for section in sections:
+        data = section.tobytes() if isinstance(section, array) else section
+        out += struct.pack("I", len(data)) + data
+        out += b"\0" * (-len(out) % 4)
+    return bytes(out)
+
+
+def write(path: str, data: bytes) -> None:
+    """Write an index file atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", delete=False, suffix=".tmp") as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+
+class StringTable:
+    """Strings stored as offsets into a UTF-8 blob."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.key(index).decode()
+
+    def key(self, index: int) -> bytes:
+        """Return the encoded string at an index."""
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]])
+
+    def find(self, value: str) -> int:
+        """Return the index of a value in a sorted table, or -1."""
+        key = value.encode()
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.key(low) == key:
+            return low
+        return -1
+
+
+class PostingTable:
+    """Sorted keys, each with a run of uint32 postings."""
+
+    def __init__(self, keys: StringTable, offsets: memoryview, postings: memoryview):
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+
+    def get(self, key: str) -> memoryview:
+        """Return the postings for a key."""
+        index = self.keys.find(key)
+        if index < 0:
+            return self.postings[0:0]
+        return self.postings[self.offsets[index]:self.offsets[index + 1]]
+
+    def items(self) -> dict:
+        """Return every key with its postings."""
+        return {self.keys[i]: self.postings[self.offsets[i]:self.offsets[i + 1]] for i in range(len(self.keys))}
+
+
+class IndexFile:
+    """A memory-mapped index file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Not a Connections index: {path}")
+        sections = []
+        position = len(MAGIC)
+        while position < len(view):
+            (size,) = struct.unpack_from("I", view, position)
+            sections.append(view[position + 4:position + 4 + size])
+            position += 4 + size + (-(4 + size) % 4)
+        uint32 = [sections[i].cast("I") for i in (0, 2, 4, 5, 7, 8, 9, 11, 12)]
+        self.dates = StringTable(uint32[0], sections[1])
+        self.titles = StringTable(uint32[1], sections[3])
+        self.categories = uint32[2]
+        self.words = PostingTable(StringTable(uint32[3], sections[6]), uint32[4], uint32[5])
+        self.terms = PostingTable(StringTable(uint32[6], sections[10]), uint32[7], uint32[8])
+
+    def category(self, category_id: int) -> tuple:
+        """Return the date, category number and title of a category."""
+        date_index, number, title_index = self.categories[category_id * 3:category_id * 3 + 3]
+        return self.dates[date_index], number, self.titles[title_index]
+
+    def word_hits(self, word: str) -> list:
+        """Return the puzzles a normalised word appeared in."""
+        hits = []
+        for posting in self.words.get(word):
+            print_date, number, title = self.category(posting >> 8)
+            hits.append({"print_date": print_date, "category": number, "title": title, "position": posting & 0xFF})
+        return hits
+
+    def title_hits(self, term: str) -> list:
+        """Return the categories with a normalised title."""
+        hits = []
+        for category_id in self.terms.get(term):
+            print_date, number, title = self.category(category_id)
+            hits.append({"print_date": print_date, "category": number, "title": title})
+        return hits
+
+
+class ConnectionsIndex:
+    """Word and category title index across all Connections puzzles."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.base = None
+        self.reset_delta()
+
+    def reset_delta(self) -> None:
+        """Clear the puzzles recorded since the index file was built."""
+        self.delta_dates = set()
+        self.delta_words = defaultdict(list)
+        self.delta_terms = defaultdict(list)
+        self.snapshots = {}
+
+    def open(self, source=None) -> None:
+        """Map the index file, rebuilding it first if it is missing or stale."""
+        if not self.path:
+            return
+        base = None
+        try:
+            base = IndexFile(self.path)
+        except (FileNotFoundError, ValueError):
+            pass
+        if source is not None:
+            keys = source.keys("connections")
+            if base is None or [base.dates[i] for i in range(len(base.dates))] != keys:
+                write(self.path, build(source.iter("connections")))
+                base = IndexFile(self.path)
+        with self.lock:
+            self.base = base
+            if base:
+                self._trim_delta()
+            self.snapshots = {}
+
+    def _trim_delta(self) -> None:
+        """Drop delta entries for puzzles that are now in the index file."""
+        dates = {date for date in self.delta_dates if self.base.dates.find(date) >= 0}
+        if not dates:
+            return
+        self.delta_dates -= dates
+        for postings in (self.delta_words, self.delta_terms):
+            for key in list(postings):
+                postings[key] = [hit for hit in postings[key] if hit["print_date"] not in dates]
+                if not postings[key]:
+                    del postings[key]
+
+    def record(self, model, data: dict) -> None:
+        """Add a newly loaded puzzle to the in-memory delta."""
+        if model is not ConnectionsPuzzle:
+            return
+        print_date = data["print_date"]
+        with self.lock:
+            if print_date in self.delta_dates:
+                return
+            if self.base and self.base.dates.find(print_date) >= 0:
+                return
+            self.delta_dates.add(print_date)
+            for number, category in enumerate(data["categories"]):
+                title = category["title"]
+                hit = {"print_date": print_date, "category": number, "title": title}
+                self.delta_terms[normalise_title(title)].append(hit)
+                for card in category["cards"]:
+                    word = normalise_word(card["content"])
+                    self.delta_words[word].append({**hit, "position": card["position"]})
+            self.snapshots = {}
+
+    def puzzles(self) -> int:
+        """Return the number of indexed puzzles."""
+        return (len(self.base.dates) if self.base else 0) + len(self.delta_dates)
+
+    def search_word(self, word: str) -> dict:
+        """Return every puzzle containing a word."""
+        word = normalise_word(word)
+        with self.lock:
+            hits = (self.base.word_hits(word) if self.base else []) + self.delta_words.get(word, [])
+        hits.sort(key=lambda hit: hit["print_date"])
+        return {"word": word, "puzzles": len({hit["print_date"] for hit in hits}), "hits": hits}
+
+    def search_title(self, title: str) -> dict:
+        """Return every category with the same normalised title."""
+        term = normalise_title(title)
+        with self.lock:
+            hits = (self.base.title_hits(term) if self.base else []) + self.delta_terms.get(term, [])
+        hits.sort(key=lambda hit: hit["print_date"])
+        return {"title": term, "puzzles": len({hit["print_date"] for hit in hits}), "hits": hits}
+
+    def repeats(self) -> dict:
+        """Return the words and category titles used in the most puzzles."""
+        with self.lock:
+            if "repeats" not in self.snapshots:
+                self.snapshots["repeats"] = self._repeats()
+            return self.snapshots["repeats"]
+
+    def _repeats(self) -> dict:
+        words = Counter()
+        titles = Counter()
+        if self.base:
+            categories = self.base.categories
+            for word, postings in self.base.words.items().items():
+                words[word] = len({categories[(posting >> 8) * 3] for posting in postings})
+            for term, postings in self.base.terms.items().items():
+                titles[term] = len({categories[category_id * 3] for category_id in postings})
+        for word, hits in self.delta_words.items():
+            words[word] += len({hit["print_date"] for hit in hits})
+        for term, hits in self.delta_terms.items():
+            titles[term] += len({hit["print_date"] for hit in hits})
+        return {
+            "puzzles": self.puzzles(),
+            "words": [
+                {"name": word, "count": count}
+                for word, count in words.most_common(TOP) if count > 1
+            ],
+            "categories": [
+                {"name": term, "count": count}
+                for term, count in titles.most_common(TOP) if count > 1
+            ],
+        }
+
+
+connections_index = ConnectionsIndex(CONNECTIONS_INDEX_PATH)
@@ -0,0 +1,92 @@
+"""NYT Games API Connections search index benchmark.
+
+Archives a few years of synthetic Connections puzzles, builds and maps the
+index, and compares a word lookup against scanning every archived puzzle:
+
+    python search_bench.py
+"""
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from archive import Archive
+from search import ConnectionsIndex
+
+PUZZLES = int(os.environ.get("BENCH_PUZZLES", "1500"))
+RUNS = int(os.environ.get("BENCH_RUNS", "200"))
+
+WORDS = [f"WORD{i}" for i in range(5000)]
+TITLES = ["FISH", "___ DOG", "SHADES OF BLUE", "ANAGRAMS", "THINGS THAT ARE RED", "NBA TEAMS"]
+
+
+def connections(day: datetime.date, rng: random.Random) -> dict:
+    """Return a synthetic Connections puzzle."""
+    return {
+        "id": day.toordinal(),
+        "status": "OK",
+        "print_date": day.isoformat(),
+        "editor": "Wyna Liu",
+        "categories": [
+            {
+                "title": rng.choice(TITLES),
+                "cards": [{"content": rng.choice(WORDS), "position": rng.randrange(16)} for _ in range(4)],
+            }
+            for _ in range(4)
+        ],
+    }
+
+
+def median_ms(func) -> float:
+    """Return the median run time of a function in milliseconds."""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def scan(archive: Archive, word: str) -> list:
+    """Return the dates containing a word by reading every archived puzzle."""
+    return [
+        data["print_date"]
+        for data in archive.iter("connections")
+        for category in data["categories"]
+        for card in category["cards"]
+        if card["content"].upper() == word
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    rng = random.Random(0)
+    start = datetime.date(2023, 6, 12)
+    with tempfile.TemporaryDirectory() as root:
+        archive = Archive(root)
+        for day in range(PUZZLES):
+            data = connections(start + datetime.timedelta(days=day), rng)
+            archive.store("connections", data["print_date"], data)
+
+        index = ConnectionsIndex(os.path.join(root, "connections.index"))
+        start_time = time.perf_counter()
+        index.open(archive)
+        print(f"built index of {PUZZLES} puzzles in {time.perf_counter() - start_time:.2f} s, "
+              f"{os.path.getsize(index.path) / 1024:.0f} KiB")
+
+        start_time = time.perf_counter()
+        ConnectionsIndex(index.path).open()
+        print(f"mapped existing index in {(time.perf_counter() - start_time) * 1000:.2f} ms")
+
+        word = WORDS[0]
+        assert [hit["print_date"] for hit in index.search_word(word)["hits"]] == scan(archive, word)
+        print(f"{'lookup':<16} {'median':>10}")
+        print(f"{'index word':<16} {median_ms(lambda: index.search_word(word)):8.3f} ms")
+        print(f"{'index title':<16} {median_ms(lambda: index.search_title('fish')):8.3f} ms")
+        print(f"{'archive scan':<16} {median_ms(lambda: scan(archive, word)):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""NYT Games API cold start benchmark.
+
+Measures, in fresh interpreters, the time to import and start the app and
+the latency of the first requests, including a puzzle fetched from a stubbed
+upstream, with and without the precompiled build output:
+
+    python precompile.py
+    python startup_bench.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import precompile
+
+RUNS = int(os.environ.get("BENCH_RUNS", "5"))
+
+# Runs in a fresh interpreter and prints its measurements as JSON. The app
+# is started through its lifespan, as uvicorn does, and the upstream is
+# stubbed below requests, so the first puzzle request still pays for any
+# deferred import the lifespan preload has not finished.
+PROBE = """
+import asyncio, json, sys, time, types
+
+start = time.perf_counter()
+import main
+imported = time.perf_counter() - start
+
+WORDLE = json.dumps({
+    "id": 1,
+    "days_since_launch": 932,
+    "editor": "Tracy Bennett",
+    "print_date": "2024-01-07",
+    "solution": "crane",
+}).encode()
+
+
+def send_upstream(url, timeout, **kwargs):
+    return types.SimpleNamespace(status_code=200, content=WORDLE)
+
+
+main.upstream._send = send_upstream
+
+
+async def call(path):
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8080),
+    }
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    begin = time.perf_counter()
+    await main.app(scope, receive, send)
+    assert status == [200], (path, status)
+    return time.perf_counter() - begin
+
+
+async def run():
+    lifespan = asyncio.Queue()
+    started = asyncio.Event()
+
+    async def send(message):
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    begin = time.perf_counter()
+    await lifespan.put({"type": "lifespan.startup"})
+    app = asyncio.create_task(main.app({"type": "lifespan", "asgi": {"version": "3.0"}}, lifespan.get, send))
+    await started.wait()
+    results["startup"] = time.perf_counter() - begin
+    for path in ["/openapi.json", "/status/upstream", "/wordle/2024-01-07"]:
+        results[path] = await call(path)
+    await lifespan.put({"type": "lifespan.shutdown"})
+    await app
+
+
+results = {"import": imported, "deferred_loaded": [m for m in main.DEFERRED_IMPORTS if m in sys.modules]}
+asyncio.run(run())
+print(json.dumps(results))
+"""
+
+PATHS = ["import", "startup", "/openapi.json", "/status/upstream", "/wordle/2024-01-07"]
+
+
+def probe(env: dict) -> dict:
+    """Run the probe in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        check=True,
+        cwd=precompile.HERE,
+        env={**os.environ, "PREWARM_ENABLED": "0", **env},
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(label: str, runs: list) -> None:
+    """Print median timings over several runs."""
+    print(f"{label} (median of {len(runs)} runs)")
+    print(f"  deferred modules loaded at import: {runs[0]['deferred_loaded'] or 'none'}")
+    for key in PATHS:
+        value = statistics.median(run[key] for run in runs)
+        print(f"  {key:<20} {value * 1000:8.1f} ms")
+
+
+def main() -> None:
+    """Run the benchmark, interleaving configurations to even out noise."""
+    if not os.path.exists(precompile.PRECOMPILED_PATH):
+        print(f"{precompile.PRECOMPILED_PATH} is missing, run precompile.py first")
+    configs = {
+        "precompiled": {},
+        "not precompiled": {"PRECOMPILED_PATH": os.devnull},
+    }
+    runs = {label: [] for label in configs}
+    for _ in range(RUNS):
+        for label, env in configs.items():
+            runs[label].append(probe(env))
+    for label, results in runs.items():
+        report(label, results)
+
+
+if __name__ == "__main__":
+    main()
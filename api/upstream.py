@@ -0,0 +1,281 @@
+"""NYT Games API upstream resilience module."""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from enum import Enum
+
+from starlette.concurrency import run_in_threadpool
+
+
+def _env_float(name: str, default: float) -> float:
+    """Return a float from the environment or the default."""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+CONNECT_TIMEOUT = _env_float("UPSTREAM_CONNECT_TIMEOUT", 3.05)
+READ_TIMEOUT_MIN = _env_float("UPSTREAM_READ_TIMEOUT_MIN", 2.0)
+READ_TIMEOUT_MAX = _env_float("UPSTREAM_READ_TIMEOUT_MAX", 20.0)
+READ_TIMEOUT_PERCENTILE = _env_float("UPSTREAM_READ_TIMEOUT_PERCENTILE", 0.99)
+READ_TIMEOUT_MULTIPLIER = _env_float("UPSTREAM_READ_TIMEOUT_MULTIPLIER", 2.0)
+DEADLINE = _env_float("UPSTREAM_DEADLINE", 25.0)
+MAX_ATTEMPTS = int(_env_float("UPSTREAM_MAX_ATTEMPTS", 3))
+BACKOFF_BASE = _env_float("UPSTREAM_BACKOFF_BASE", 0.1)
+BACKOFF_MAX = _env_float("UPSTREAM_BACKOFF_MAX", 2.0)
+RETRY_BUDGET_RATIO = _env_float("UPSTREAM_RETRY_BUDGET_RATIO", 0.2)
+RETRY_BUDGET_MIN_PER_SECOND = _env_float("UPSTREAM_RETRY_BUDGET_MIN_PER_SECOND", 1.0)
+BREAKER_FAILURE_THRESHOLD = int(_env_float("UPSTREAM_BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = _env_float("UPSTREAM_BREAKER_RESET_TIMEOUT", 30.0)
+
+# Path families, matched by URL prefix. Each family gets its own latency
+# tracker, retry budget and circuit breaker.
+FAMILIES = {
+    "connections": "https://www.nytimes.com/svc/connections/",
+    "crosswords": "https://www.nytimes.com/svc/crosswords/",
+    "games-state": "https://www.nytimes.com/svc/games/state/",
+    "spelling-bee": "https://www.nytimes.com/puzzles/spelling-bee",
+    "strands": "https://www.nytimes.com/games-assets/strands/",
+    "wordle": "https://www.nytimes.com/svc/wordle/",
+}
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected by an open circuit breaker."""
+
+    def __init__(self, family: str, retry_after: float):
+        super().__init__(f"Circuit breaker for {family} is open")
+        self.family = family
+        self.retry_after = retry_after
+
+
+class CircuitState(str, Enum):
+    """Circuit Breaker State."""
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class LatencyTracker:
+    """Track recent upstream latencies and derive an adaptive read timeout."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record a successful request latency."""
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the latency at the given percentile, if enough samples exist."""
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+
+    def read_timeout(self) -> float:
+        """Return the read timeout to use for the next request."""
+        observed = self.percentile(READ_TIMEOUT_PERCENTILE)
+        if observed is None:
+            return READ_TIMEOUT_MAX
+        return min(READ_TIMEOUT_MAX, max(READ_TIMEOUT_MIN, observed * READ_TIMEOUT_MULTIPLIER))
+
+
+class RetryBudget:
+    """Allow retries only as a fraction of recent requests."""
+
+    def __init__(self, ratio: float, min_per_second: float, window: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self.requests = deque()
+        self.retries = deque()
+        self.lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        """Drop events older than the window."""
+        for events in (self.requests, self.retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        """Record a first attempt."""
+        now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            self.requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """Consume a retry from the budget, if one is available."""
+        now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            allowed = self.min_per_second * self.window + self.ratio * len(self.requests)
+            if len(self.retries) >= allowed:
+                return False
+            self.retries.append(now)
+            return True
+
+
+class CircuitBreaker:
+    """Fail fast after consecutive upstream failures."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> float | None:
+        """Return None if a request may proceed, else seconds until retry."""
+        with self.lock:
+            if self.state == CircuitState.closed:
+                return None
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if self.state == CircuitState.open and remaining <= 0:
+                self.state = CircuitState.half_open
+            if self.state == CircuitState.half_open and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return None
+            return max(remaining, 1.0)
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        with self.lock:
+            self.state = CircuitState.closed
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Let another request probe after one ended without an outcome."""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure and open the breaker past the threshold."""
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == CircuitState.half_open or self.failures >= self.failure_threshold:
+                self.state = CircuitState.open
+                self.opened_at = time.monotonic()
+
+
+class Upstream:
+    """Resilience state for one upstream path family."""
+
+    def __init__(self, family: str):
+        self.family = family
+        self.latency = LatencyTracker()
+        self.retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN_PER_SECOND)
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+    def status(self) -> dict:
+        """Return the current state of this upstream."""
+        return {
+            "family": self.family,
+            "state": self.breaker.state.value,
+            "consecutive_failures": self.breaker.failures,
+            "connect_timeout": CONNECT_TIMEOUT,
+            "read_timeout": round(self.latency.read_timeout(), 3),
+            "latency_p50": self.latency.percentile(0.5),
+            "latency_p99": self.latency.percentile(0.99),
+        }
+
+
+upstreams = {family: Upstream(family) for family in FAMILIES}
+
+
+def get_upstream(url: str) -> Upstream:
+    """Return the upstream for the family that matches the URL."""
+    for family, prefix in FAMILIES.items():
+        if url.startswith(prefix):
+            return upstreams[family]
+    family = "other"
+    if family not in upstreams:
+        upstreams[family] = Upstream(family)
+    return upstreams[family]
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return True if the request that raised the error may be retried."""
+    import requests  # pylint: disable=import-outside-toplevel
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def backoff(attempt: int) -> float:
+    """Return a full-jitter exponential backoff delay."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _send(url: str, timeout: tuple, **kwargs):
+    """Send a GET request and raise for error statuses."""
+    import requests  # pylint: disable=import-outside-toplevel
+    response = requests.get(url, timeout=timeout, **kwargs)
+    print(response.request.url)
+    response.raise_for_status()
+    return response
+
+
+async def fetch(url: str, **kwargs):
+    """Return the response from a GET request, with retries and circuit breaking."""
+    # requests is imported on first use to keep it off the cold start path.
+    import requests  # pylint: disable=import-outside-toplevel
+    upstream = get_upstream(url)
+    deadline = time.monotonic() + DEADLINE
+    upstream.retry_budget.record_request()
+    attempt = 0
+    while True:
+        retry_after = upstream.breaker.allow()
+        if retry_after is not None:
+            raise CircuitOpenError(upstream.family, retry_after)
+        remaining = deadline - time.monotonic()
+        timeout = (CONNECT_TIMEOUT, min(upstream.latency.read_timeout(), max(remaining, 0.1)))
+        start = time.monotonic()
+        try:
+            response = await run_in_threadpool(_send, url, timeout, **kwargs)
+        except requests.RequestException as error:
+            retryable = is_retryable(error)
+            if retryable:
+                upstream.breaker.record_failure()
+            else:
+                # The upstream answered (e.g. 404), so it is healthy.
+                upstream.breaker.record_success()
+            attempt += 1
+            delay = backoff(attempt)
+            if (
+                not retryable
+                or attempt >= MAX_ATTEMPTS
+                or time.monotonic() + delay >= deadline
+                or not upstream.retry_budget.try_acquire()
+            ):
+                raise
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled or failed for another reason: the upstream's health
+            # is unknown, but a half-open breaker must not wait forever.
+            upstream.breaker.release_probe()
+            raise
+        upstream.latency.observe(time.monotonic() - start)
+        upstream.breaker.record_success()
+        return response
+
+
+def status() -> list:
+    """Return the status of all upstream families."""
+    return [upstream.status() for upstream in upstreams.values()]